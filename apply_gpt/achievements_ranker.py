@@ -0,0 +1,99 @@
+from typing import Mapping, Protocol, Sequence
+
+import numpy as np
+
+from apply_gpt.utils import extract_terms
+
+
+class AchievementsRanker(Protocol):
+    def rank(
+        self,
+        requirements: Sequence[str],
+        id_to_skills: Mapping[str, Sequence[str]],
+    ) -> Sequence[str]:
+        """
+        Sort the ids of the achievements from the best to the worst match.
+
+        :param requirements: the requirements of the job, from the most important
+        :param id_to_skills: the skills of each achievement
+        """
+        ...
+
+
+class WeightedOverlapAchievementsRanker(AchievementsRanker):
+    """
+    Ranks achievements by the weighted overlap of their skills with the requirements.
+
+    Requirements and skills are compared term by term, so that e.g. the skill
+    "PyTorch" partially matches the requirement "Deep learning with PyTorch". Each
+    requirement is weighted by its position, as requirements are sorted by
+    importance, and each term by its rarity among the achievements, as terms shared
+    by most achievements are not discriminative.
+    """
+
+    def __init__(self, position_decay: float = 1.0) -> None:
+        """
+        :param position_decay: how fast requirement weights decrease with position
+        """
+        self._position_decay = position_decay
+
+    def rank(
+        self,
+        requirements: Sequence[str],
+        id_to_skills: Mapping[str, Sequence[str]],
+    ) -> Sequence[str]:
+        ids = list(id_to_skills)
+        if len(ids) == 0 or len(requirements) == 0:
+            return ids
+
+        term_to_index: dict[str, int] = {}
+        requirements_terms = [
+            [term_to_index.setdefault(t, len(term_to_index)) for t in extract_terms(r)]
+            for r in requirements
+        ]
+
+        # NOTE: only terms occurring in requirements can contribute to the score
+        skill_to_term_indices: dict[str, Sequence[int]] = {}
+        achievement_indices: list[int] = []
+        term_indices: list[int] = []
+        for achievement_index, id_ in enumerate(ids):
+            for skill in id_to_skills[id_]:
+                skill_term_indices = skill_to_term_indices.get(skill)
+                if skill_term_indices is None:
+                    skill_term_indices = [
+                        term_to_index[t]
+                        for t in extract_terms(skill)
+                        if t in term_to_index
+                    ]
+                    skill_to_term_indices[skill] = skill_term_indices
+                achievement_indices.extend(
+                    [achievement_index] * len(skill_term_indices)
+                )
+                term_indices.extend(skill_term_indices)
+
+        # Achievements x terms incidence matrix
+        achievements_terms = np.zeros((len(ids), len(term_to_index)), dtype=np.float64)
+        achievements_terms[achievement_indices, term_indices] = 1.0
+
+        # Requirements x terms matrix, each requirement row summing to one
+        requirements_matrix = np.zeros(
+            (len(requirements), len(term_to_index)), dtype=np.float64
+        )
+        for requirement_index, requirement_terms in enumerate(requirements_terms):
+            if len(requirement_terms) > 0:
+                requirements_matrix[requirement_index, requirement_terms] = 1.0 / len(
+                    set(requirement_terms)
+                )
+
+        document_frequencies = achievements_terms.sum(axis=0)
+        term_weights = np.log((len(ids) + 1) / (document_frequencies + 1)) + 1.0
+
+        positions = np.arange(len(requirements), dtype=np.float64)
+        requirement_weights = 1.0 / (1.0 + self._position_decay * positions)
+
+        # Achievements x requirements fraction of requirement terms covered
+        coverages = (achievements_terms * term_weights) @ requirements_matrix.T
+        scores = coverages @ requirement_weights
+
+        sorted_indices = np.argsort(-scores, kind="stable")
+        return [ids[i] for i in sorted_indices]
@@ -1,8 +1,21 @@
+from __future__ import annotations
+
+import asyncio
 import json
-import random
-from typing import Protocol, Sequence
+from typing import TYPE_CHECKING, Any, Protocol, Sequence
+
+from apply_gpt.cache import DiskCache
+from apply_gpt.openai_ import (
+    JsonGenerator,
+    OpenaiJsonGenerator,
+    OpenaiManualJsonGenerator,
+)
+from apply_gpt.task_graph import TaskGraph
+from apply_gpt.utils import Json
 
-from apply_gpt.openai_ import OpenaiManualJsonGenerator
+if TYPE_CHECKING:
+    # NOTE: only needed for typing, while importing numpy is slow
+    from apply_gpt.achievements_ranker import AchievementsRanker
 
 
 class AchievementsTuner(Protocol):
@@ -23,12 +36,22 @@ class OpenaiManualAchievementsTuner(AchievementsTuner):
         achievements_skills_msg_prefix: str,
         achievements_sort_msg_prefix: str,
         achievements_reword_msg_prefix: str,
+        skills_index: DiskCache | None = None,
+        achievements_ranker: AchievementsRanker | None = None,
     ) -> None:
+        """
+        :param skills_index: the cache storing the skills extracted from each
+            achievement, so that only new or edited achievements are sent to ChatGPT
+        :param achievements_ranker: the ranker sorting achievements locally, if not
+            provided the sorting is done by ChatGPT
+        """
         self._openai_manual_json_generator = openai_manual_json_generator
         self._job_skills_msg_prefix = job_skills_msg_prefix
         self._achievements_skills_msg_prefix = achievements_skills_msg_prefix
         self._achievements_sort_msg_prefix = achievements_sort_msg_prefix
         self._achievements_reword_msg_prefix = achievements_reword_msg_prefix
+        self._skills_index = _SkillsIndex(skills_index, achievements_skills_msg_prefix)
+        self._achievements_ranker = achievements_ranker
 
     def tune_achievements(
         self,
@@ -36,30 +59,32 @@ class OpenaiManualAchievementsTuner(AchievementsTuner):
         job_description: str,
         max_achievements: int | None = None,
     ) -> Sequence[str]:
-        self._openai_manual_json_generator.generate(
+        requirements: Sequence[
+            str
+        ] = self._openai_manual_json_generator.generate(  # type: ignore[assignment]
             f"{self._job_skills_msg_prefix}\n" f"{job_description}"
         )
 
-        random.sample(achievements, len(achievements))
-
         id_to_achievement = {
             f"{id_}": achievement
             for id_, achievement in enumerate(achievements, start=1)
         }
 
-        id_to_achievement_str = json.dumps(id_to_achievement, indent=2)
-        id_to_skills: dict[
-            str, Sequence[str]
-        ] = self._openai_manual_json_generator.generate(  # type: ignore[assignment]
-            f"{self._achievements_skills_msg_prefix}\n" f"{id_to_achievement_str}"
-        )
+        id_to_skills = self._extract_skills(id_to_achievement)
 
-        id_to_skills_str = json.dumps(id_to_skills, indent=2)
-        sorted_ids: Sequence[
-            str
-        ] = self._openai_manual_json_generator.generate(  # type: ignore[assignment]
-            f"{self._achievements_sort_msg_prefix}\n" f"{id_to_skills_str}"
-        )
+        sorted_ids: Sequence[str]
+        if self._achievements_ranker is not None:
+            sorted_ids = self._achievements_ranker.rank(requirements, id_to_skills)
+        else:
+            requirements_str = json.dumps(requirements, indent=2)
+            id_to_skills_str = json.dumps(id_to_skills, indent=2)
+            generated_json = self._openai_manual_json_generator.generate(
+                f"{self._achievements_sort_msg_prefix}\n"
+                f"{requirements_str}\n"
+                f"{id_to_skills_str}",
+                validate=lambda j: _sorted_ids(j, id_to_achievement),
+            )
+            sorted_ids = _sorted_ids(generated_json, id_to_achievement)
 
         if max_achievements is not None:
             selected_ids = sorted_ids[:max_achievements]
@@ -72,7 +97,473 @@ class OpenaiManualAchievementsTuner(AchievementsTuner):
         tuned_achievements: Sequence[
             str
         ] = self._openai_manual_json_generator.generate(  # type: ignore[assignment]
-            f"{self._achievements_reword_msg_prefix}\n" f"{selected_achievements_str}"
+            f"{self._achievements_reword_msg_prefix}\n"
+            f"{job_description}\n"
+            f"{selected_achievements_str}"
         )
 
         return tuned_achievements
+
+    def _extract_skills(
+        self, id_to_achievement: dict[str, str]
+    ) -> dict[str, Sequence[str]]:
+        (
+            id_to_indexed_skills,
+            id_to_unindexed_achievement,
+        ) = self._skills_index.partition(id_to_achievement)
+
+        id_to_extracted_skills: dict[str, Sequence[str]] = {}
+        if len(id_to_unindexed_achievement) > 0:
+            id_to_achievement_str = json.dumps(id_to_unindexed_achievement, indent=2)
+            generated_json = self._openai_manual_json_generator.generate(
+                f"{self._achievements_skills_msg_prefix}\n" f"{id_to_achievement_str}",
+                validate=lambda j: _extracted_skills(j, id_to_unindexed_achievement),
+            )
+            id_to_extracted_skills = _extracted_skills(
+                generated_json, id_to_unindexed_achievement
+            )
+            for id_, achievement in id_to_unindexed_achievement.items():
+                self._skills_index.put(achievement, id_to_extracted_skills[id_])
+
+        return {
+            id_: (
+                id_to_indexed_skills[id_]
+                if id_ in id_to_indexed_skills
+                else id_to_extracted_skills[id_]
+            )
+            for id_ in id_to_achievement
+        }
+
+
+class OpenaiAchievementsTuner(AchievementsTuner):
+    """
+    Tunes achievements with OpenAI API calls, running independent steps concurrently.
+
+    The job requirements and the skills of the achievements are extracted
+    concurrently, then the achievements are sorted and the best ones reworded.
+    """
+
+    def __init__(
+        self,
+        openai_json_generator: JsonGenerator,
+        system_message: str,
+        job_skills_msg_prefix: str,
+        achievements_skills_msg_prefix: str,
+        achievements_sort_msg_prefix: str,
+        achievements_reword_msg_prefix: str,
+        skills_index: DiskCache | None = None,
+        achievements_ranker: AchievementsRanker | None = None,
+        reword_chunk_size: int | None = None,
+    ) -> None:
+        """
+        :param skills_index: the cache storing the skills extracted from each
+            achievement, so that only new or edited achievements are sent to OpenAI
+        :param achievements_ranker: the ranker sorting achievements locally, if not
+            provided the sorting is done by OpenAI
+        :param reword_chunk_size: the number of achievements reworded by each of the
+            concurrent requests, if not provided they are reworded in one request
+        """
+        if reword_chunk_size is not None and reword_chunk_size < 1:
+            raise ValueError(
+                f"Reword chunk size should be positive, got {reword_chunk_size}"
+            )
+        self._openai_json_generator = openai_json_generator
+        self._system_message = system_message
+        self._job_skills_msg_prefix = job_skills_msg_prefix
+        self._achievements_skills_msg_prefix = achievements_skills_msg_prefix
+        self._achievements_sort_msg_prefix = achievements_sort_msg_prefix
+        self._achievements_reword_msg_prefix = achievements_reword_msg_prefix
+        self._skills_index = _SkillsIndex(skills_index, achievements_skills_msg_prefix)
+        self._achievements_ranker = achievements_ranker
+        self._reword_chunk_size = reword_chunk_size
+
+    def tune_achievements(
+        self,
+        achievements: Sequence[str],
+        job_description: str,
+        max_achievements: int | None = None,
+    ) -> Sequence[str]:
+        return asyncio.run(
+            self.atune_achievements(achievements, job_description, max_achievements)
+        )
+
+    async def atune_achievements(
+        self,
+        achievements: Sequence[str],
+        job_description: str,
+        max_achievements: int | None = None,
+    ) -> Sequence[str]:
+        id_to_achievement = {
+            f"{id_}": achievement
+            for id_, achievement in enumerate(achievements, start=1)
+        }
+
+        async def extract_requirements() -> Sequence[str]:
+            return await self._agenerate_strings(
+                f"{self._job_skills_msg_prefix}\n" f"{job_description}",
+                name="requirements",
+            )
+
+        async def extract_skills() -> dict[str, Sequence[str]]:
+            return await self._aextract_skills(id_to_achievement)
+
+        async def sort(
+            requirements: Sequence[str], id_to_skills: dict[str, Sequence[str]]
+        ) -> Sequence[str]:
+            if self._achievements_ranker is not None:
+                return self._achievements_ranker.rank(requirements, id_to_skills)
+            requirements_str = json.dumps(requirements, indent=2)
+            id_to_skills_str = json.dumps(id_to_skills, indent=2)
+            generated_sorted_ids = await self._agenerate_strings(
+                f"{self._achievements_sort_msg_prefix}\n"
+                f"{requirements_str}\n"
+                f"{id_to_skills_str}",
+                name="sorted_ids",
+            )
+            return _sorted_ids(generated_sorted_ids, id_to_achievement)
+
+        async def reword(sorted_ids: Sequence[str]) -> Sequence[str]:
+            if max_achievements is not None:
+                selected_ids = sorted_ids[:max_achievements]
+            else:
+                selected_ids = sorted_ids
+            selected_achievements = [id_to_achievement[id_] for id_ in selected_ids]
+            return await self._areword(selected_achievements, job_description)
+
+        task_graph = TaskGraph()
+        task_graph.add("requirements", extract_requirements)
+        task_graph.add("id_to_skills", extract_skills)
+        task_graph.add("sorted_ids", sort, ("requirements", "id_to_skills"))
+        task_graph.add("tuned_achievements", reword, ("sorted_ids",))
+        results = await task_graph.run()
+
+        tuned_achievements: Sequence[str] = results["tuned_achievements"]
+        return tuned_achievements
+
+    async def _areword(
+        self, achievements: Sequence[str], job_description: str
+    ) -> Sequence[str]:
+        chunk_size = self._reword_chunk_size or max(len(achievements), 1)
+        chunks = [
+            achievements[i : i + chunk_size]
+            for i in range(0, len(achievements), chunk_size)
+        ]
+
+        async def reword_chunk(chunk: Sequence[str]) -> Sequence[str]:
+            chunk_str = json.dumps(chunk, indent=2)
+            reworded_chunk = await self._agenerate_strings(
+                f"{self._achievements_reword_msg_prefix}\n"
+                f"{job_description}\n"
+                f"{chunk_str}",
+                name="reworded_achievements",
+            )
+            if len(reworded_chunk) != len(chunk):
+                raise ValueError(
+                    f"Expected {len(chunk)} reworded achievements, "
+                    f"got {len(reworded_chunk)}"
+                )
+            return reworded_chunk
+
+        reworded_chunks = await asyncio.gather(*(reword_chunk(c) for c in chunks))
+
+        return [a for reworded_chunk in reworded_chunks for a in reworded_chunk]
+
+    async def _aextract_skills(
+        self, id_to_achievement: dict[str, str]
+    ) -> dict[str, Sequence[str]]:
+        (
+            id_to_indexed_skills,
+            id_to_unindexed_achievement,
+        ) = self._skills_index.partition(id_to_achievement)
+
+        id_to_extracted_skills: dict[str, Sequence[str]] = {}
+        id_to_missing_achievement = id_to_unindexed_achievement
+        # NOTE: the achievements left out of a response are requested once more
+        for _ in range(2):
+            if len(id_to_missing_achievement) == 0:
+                break
+            id_to_extracted_skills.update(
+                await self._agenerate_skills(id_to_missing_achievement)
+            )
+            id_to_missing_achievement = {
+                id_: achievement
+                for id_, achievement in id_to_missing_achievement.items()
+                if id_ not in id_to_extracted_skills
+            }
+        if len(id_to_missing_achievement) > 0:
+            raise ValueError(f"Missing skills of ids {list(id_to_missing_achievement)}")
+        for id_, achievement in id_to_unindexed_achievement.items():
+            self._skills_index.put(achievement, id_to_extracted_skills[id_])
+
+        return {
+            id_: (
+                id_to_indexed_skills[id_]
+                if id_ in id_to_indexed_skills
+                else id_to_extracted_skills[id_]
+            )
+            for id_ in id_to_achievement
+        }
+
+    async def _agenerate_skills(
+        self, id_to_achievement: dict[str, str]
+    ) -> dict[str, Sequence[str]]:
+        """
+        Extract the skills of achievements, leaving out those missing in the response.
+        """
+        id_to_achievement_str = json.dumps(id_to_achievement, indent=2)
+        generated_json: dict[
+            str, Any
+        ] = await self._openai_json_generator.agenerate(  # type: ignore[assignment]
+            system_message=self._system_message,
+            user_message=(
+                f"{self._achievements_skills_msg_prefix}\n" f"{id_to_achievement_str}"
+            ),
+            name="achievements_skills",
+            schema=OpenaiAchievementsTuner._ACHIEVEMENTS_SKILLS_JSON_SCHEMA,
+        )
+        return {
+            achievement_skills["id"]: achievement_skills["skills"]
+            for achievement_skills in generated_json["achievements"]
+            if achievement_skills["id"] in id_to_achievement
+        }
+
+    async def _agenerate_strings(self, user_message: str, name: str) -> Sequence[str]:
+        generated_json: dict[
+            str, Any
+        ] = await self._openai_json_generator.agenerate(  # type: ignore[assignment]
+            system_message=self._system_message,
+            user_message=user_message,
+            name=name,
+            schema={
+                "type": "object",
+                "required": (name,),
+                "properties": {
+                    name: {"type": "array", "items": {"type": "string"}},
+                },
+            },
+        )
+        strings: Sequence[str] = generated_json[name]
+        return strings
+
+    _ACHIEVEMENTS_SKILLS_JSON_SCHEMA: OpenaiJsonGenerator.Schema = {
+        "type": "object",
+        "required": ("achievements",),
+        "properties": {
+            "achievements": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ("id", "skills"),
+                    "properties": {
+                        "id": {"type": "string"},
+                        "skills": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+class OpenaiManualConsolidatedAchievementsTuner(AchievementsTuner):
+    """
+    Tunes achievements with a single manual interaction with ChatGPT, instead of one
+    per step, asking for the requirements of the job, the skills of achievements,
+    their order and the rewording of the best ones in one message.
+    """
+
+    def __init__(
+        self,
+        openai_manual_json_generator: OpenaiManualJsonGenerator,
+        consolidated_msg_prefix: str,
+    ) -> None:
+        """
+        :param consolidated_msg_prefix: the instructions of all the steps, followed
+            in the message by the schema of the response, the number of achievements
+            to reword, the job description and the achievements
+        """
+        self._openai_manual_json_generator = openai_manual_json_generator
+        self._consolidated_msg_prefix = consolidated_msg_prefix
+
+    def tune_achievements(
+        self,
+        achievements: Sequence[str],
+        job_description: str,
+        max_achievements: int | None = None,
+    ) -> Sequence[str]:
+        id_to_achievement = {
+            f"{id_}": achievement
+            for id_, achievement in enumerate(achievements, start=1)
+        }
+        selected_count = (
+            min(max_achievements, len(achievements))
+            if max_achievements is not None
+            else len(achievements)
+        )
+
+        schema_str = json.dumps(
+            OpenaiManualConsolidatedAchievementsTuner._CONSOLIDATED_JSON_SCHEMA,
+            indent=2,
+        )
+        id_to_achievement_str = json.dumps(id_to_achievement, indent=2)
+        generated_json = self._openai_manual_json_generator.generate(
+            f"{self._consolidated_msg_prefix}\n"
+            f"{schema_str}\n"
+            f"{selected_count}\n"
+            f"{job_description}\n"
+            f"{id_to_achievement_str}",
+            validate=lambda j: _tuned_achievements(
+                j, id_to_achievement, selected_count
+            ),
+        )
+
+        return _tuned_achievements(generated_json, id_to_achievement, selected_count)
+
+    _CONSOLIDATED_JSON_SCHEMA: OpenaiJsonGenerator.Schema = {
+        "type": "object",
+        "required": (
+            "requirements",
+            "achievements",
+            "sorted_ids",
+            "reworded_achievements",
+        ),
+        "properties": {
+            "requirements": {"type": "array", "items": {"type": "string"}},
+            "achievements": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ("id", "skills"),
+                    "properties": {
+                        "id": {"type": "string"},
+                        "skills": {"type": "array", "items": {"type": "string"}},
+                    },
+                },
+            },
+            "sorted_ids": {"type": "array", "items": {"type": "string"}},
+            "reworded_achievements": {"type": "array", "items": {"type": "string"}},
+        },
+    }
+
+
+def _extracted_skills(
+    generated_json: Json, id_to_achievement: dict[str, str]
+) -> dict[str, Sequence[str]]:
+    """
+    Extract the skills of achievements from a JSON dictionary mapping their ids to
+    lists of skills, checking that no achievement was left out.
+
+    :raise ValueError: if the skills of an achievement are missing
+    """
+    if not isinstance(generated_json, dict):
+        raise ValueError("Expected a JSON dictionary")
+    id_to_extracted_skills: dict[str, Sequence[str]] = {}
+    for id_, skills in generated_json.items():
+        if id_ in id_to_achievement and isinstance(skills, list):
+            id_to_extracted_skills[id_] = [s for s in skills if isinstance(s, str)]
+    missing_ids = [
+        id_ for id_ in id_to_achievement if id_ not in id_to_extracted_skills
+    ]
+    if len(missing_ids) > 0:
+        raise ValueError(f"Missing skills of ids {missing_ids}")
+    return id_to_extracted_skills
+
+
+def _sorted_ids(
+    generated_sorted_ids: object, id_to_achievement: dict[str, str]
+) -> list[str]:
+    """
+    Normalize the ids of achievements sorted by a model into each known id once,
+    dropping unknown ids, and appending the ids left out in their original order.
+
+    :raise ValueError: if the ids are not a list
+    """
+    if not isinstance(generated_sorted_ids, list):
+        raise ValueError("Expected a JSON list of ids")
+    # NOTE: ids are often generated as numbers, as they look like ones
+    generated_ids = (str(id_) for id_ in generated_sorted_ids)
+    sorted_ids = dict.fromkeys(id_ for id_ in generated_ids if id_ in id_to_achievement)
+    sorted_ids.update(dict.fromkeys(id_to_achievement))
+    return list(sorted_ids)
+
+
+def _tuned_achievements(
+    generated_json: Json, id_to_achievement: dict[str, str], selected_count: int
+) -> Sequence[str]:
+    """
+    Extract the reworded achievements of a consolidated tuning, checking that the
+    steps leading to them were followed.
+
+    :raise ValueError: if the tuning is invalid
+    """
+    if not isinstance(generated_json, dict):
+        raise ValueError("Expected a JSON object")
+    for key in ("requirements", "achievements", "sorted_ids", "reworded_achievements"):
+        if not isinstance(generated_json.get(key), list):
+            raise ValueError(f"Expected a list of `{key}`")
+
+    generated_sorted_ids = generated_json["sorted_ids"]
+    assert isinstance(generated_sorted_ids, list)
+    # NOTE: ids are often generated as numbers, as they look like ones
+    sorted_ids = [str(id_) for id_ in generated_sorted_ids]
+    unknown_ids = [id_ for id_ in sorted_ids if id_ not in id_to_achievement]
+    if len(unknown_ids) > 0:
+        raise ValueError(f"Unknown sorted ids {unknown_ids}")
+    if len(set(sorted_ids[:selected_count])) < selected_count:
+        raise ValueError(f"Expected {selected_count} distinct sorted ids")
+
+    reworded_achievements = generated_json["reworded_achievements"]
+    assert isinstance(reworded_achievements, list)
+    tuned_achievements = [a for a in reworded_achievements if isinstance(a, str)]
+    if len(tuned_achievements) != selected_count:
+        raise ValueError(
+            f"Expected {selected_count} reworded achievements, "
+            f"got {len(tuned_achievements)}"
+        )
+    return tuned_achievements
+
+
+class _SkillsIndex:
+    """
+    Optional persistent mapping from achievements to the skills extracted from them.
+    """
+
+    def __init__(self, cache: DiskCache | None, skills_msg_prefix: str) -> None:
+        self._cache = cache
+        self._skills_msg_prefix = skills_msg_prefix
+
+    def get(self, achievement: str) -> Sequence[str] | None:
+        if self._cache is None:
+            return None
+        skills_bytes = self._cache.get(self._key(achievement))
+        if skills_bytes is None:
+            return None
+        skills: Sequence[str] = json.loads(skills_bytes)
+        return skills
+
+    def put(self, achievement: str, skills: Sequence[str]) -> None:
+        if self._cache is None:
+            return
+        self._cache.put(self._key(achievement), json.dumps(skills).encode())
+
+    def partition(
+        self, id_to_achievement: dict[str, str]
+    ) -> tuple[dict[str, Sequence[str]], dict[str, str]]:
+        """
+        Split achievements into the skills of indexed ones and the unindexed ones.
+        """
+        id_to_indexed_skills: dict[str, Sequence[str]] = {}
+        id_to_unindexed_achievement: dict[str, str] = {}
+        for id_, achievement in id_to_achievement.items():
+            indexed_skills = self.get(achievement)
+            if indexed_skills is not None:
+                id_to_indexed_skills[id_] = indexed_skills
+            else:
+                id_to_unindexed_achievement[id_] = achievement
+        return id_to_indexed_skills, id_to_unindexed_achievement
+
+    def _key(self, achievement: str) -> str:
+        # NOTE: extracted skills depend on the prompt as well as on the achievement
+        return DiskCache.key(self._skills_msg_prefix, achievement)
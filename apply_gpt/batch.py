@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Sequence
+
+from apply_gpt.cache import DiskCache
+from apply_gpt.curriculum_generator import CurriculumGenerator
+from apply_gpt.data import AboutMe, Curriculum
+from apply_gpt.job_description import strip_boilerplate
+from apply_gpt.near_duplicates import find_near_duplicates
+from apply_gpt.utils import Json
+
+
+class BatchJob(NamedTuple):
+    """
+    A curriculum to generate, for a profile and a job description.
+    """
+
+    id: str
+    about_me_path: Path
+    job_description_path: Path
+
+
+class BatchSummary(NamedTuple):
+    done_count: int
+    skipped_count: int
+    failed_count: int
+
+
+def read_manifest(path: Path) -> Sequence[BatchJob]:
+    """
+    Read the jobs of a JSONL manifest, one object per line like
+    `{"about_me": "about/me.yaml", "job_description": "jobs/adobe.txt"}`.
+
+    Relative paths are relative to the directory of the manifest. Jobs are
+    identified by an optional `id`, or else by their paths as written, so that
+    identifiers do not change across runs of the same manifest.
+    """
+    jobs: list[BatchJob] = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if len(line.strip()) == 0:
+                continue
+            try:
+                entry = json.loads(line)
+                about_me = entry["about_me"]
+                job_description = entry["job_description"]
+                job = BatchJob(
+                    id=str(
+                        entry.get("id")
+                        or DiskCache.key("batch_job", about_me, job_description)[:16]
+                    ),
+                    about_me_path=path.parent / about_me,
+                    job_description_path=path.parent / job_description,
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid job at `{path}:{line_number}`: {e!r}")
+            jobs.append(job)
+    return jobs
+
+
+class Checkpoint:
+    """
+    Append-only record of the identifiers of the jobs done, surviving crashes.
+
+    A line torn by a crash while being appended is ignored when loading.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._done_ids: set[str] = set()
+        if path.exists():
+            self._done_ids.update(_truncate_torn_line(path).decode().split())
+
+    def is_done(self, id_: str) -> bool:
+        return id_ in self._done_ids
+
+    def mark_done(self, id_: str) -> None:
+        _append(self._path, f"{id_}\n".encode())
+        self._done_ids.add(id_)
+
+
+class JsonlShards:
+    """
+    Records spread over JSONL files, each appended to atomically.
+
+    Each record is written with a single append to a file opened in append mode,
+    so that concurrent writers never interleave lines, and synced to disk before
+    returning. A line torn by a crash while being appended is removed on opening.
+    """
+
+    def __init__(self, path: Path, shard_count: int = 16) -> None:
+        """
+        :param path: the directory of the shards, created if needed
+        :param shard_count: the number of shards, which can change between runs
+        """
+        if shard_count < 1:
+            raise ValueError(f"Invalid shard count {shard_count}")
+        path.mkdir(parents=True, exist_ok=True)
+        for shard_path in path.glob("shard-*.jsonl"):
+            _truncate_torn_line(shard_path)
+        self._path = path
+        self._shard_count = shard_count
+
+    def append(self, key: str, record: Json) -> None:
+        """
+        Append a record to the shard of the key, e.g. the id of a job.
+        """
+        shard_index = int(DiskCache.key(key)[:8], 16) % self._shard_count
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        _append(self._path / f"shard-{shard_index:03d}.jsonl", line.encode())
+
+
+class BatchRunner:
+    """
+    Generates the curriculums of a batch of jobs, resuming where a previous run
+    stopped.
+
+    Results are appended to JSONL shards before their jobs are checkpointed, so a
+    crash in between can only duplicate a result, under the same id, and never lose
+    one. Failed jobs are not checkpointed, so that they are retried by the next run.
+    """
+
+    def __init__(
+        self,
+        curriculum_generator: CurriculumGenerator,
+        shards: JsonlShards,
+        checkpoint: Checkpoint,
+        concurrency: int = 4,
+        near_duplicate_threshold: float | None = None,
+    ) -> None:
+        """
+        :param near_duplicate_threshold: the similarity above which the job
+            descriptions of a profile are near-duplicates within a run, reusing the
+            curriculum of the first one, e.g. postings reposted on several boards
+        """
+        self._curriculum_generator = curriculum_generator
+        self._shards = shards
+        self._checkpoint = checkpoint
+        self._concurrency = concurrency
+        self._near_duplicate_threshold = near_duplicate_threshold
+
+    async def run(
+        self, jobs: Iterable[BatchJob], load_about_me: Callable[[Path], AboutMe]
+    ) -> BatchSummary:
+        """
+        :param jobs: the jobs, of which those already done or repeated are skipped
+        :param load_about_me: the function loading a profile, called once per path
+        """
+        id_to_pending_job: dict[str, BatchJob] = {}
+        skipped_count = 0
+        for job in jobs:
+            if self._checkpoint.is_done(job.id) or job.id in id_to_pending_job:
+                skipped_count += 1
+            else:
+                id_to_pending_job[job.id] = job
+        pending_jobs = list(id_to_pending_job.values())
+
+        id_to_original_id: dict[str, str] = {}
+        if self._near_duplicate_threshold is not None:
+            id_to_original_id = self._find_near_duplicates(pending_jobs)
+
+        path_to_about_me: dict[Path, AboutMe] = {}
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def generate(job: BatchJob) -> Curriculum:
+            async with semaphore:
+                if job.about_me_path not in path_to_about_me:
+                    path_to_about_me[job.about_me_path] = load_about_me(
+                        job.about_me_path
+                    )
+                return await self._curriculum_generator.agenerate_curriculum(
+                    about_me=path_to_about_me[job.about_me_path],
+                    job_description=job.job_description_path.read_text(),
+                )
+
+        id_to_generation = {
+            job.id: asyncio.ensure_future(generate(job))
+            for job in pending_jobs
+            if job.id not in id_to_original_id
+        }
+
+        async def run_job(job: BatchJob) -> bool:
+            try:
+                curriculum = await id_to_generation[
+                    id_to_original_id.get(job.id, job.id)
+                ]
+                self._shards.append(job.id, curriculum_record(job, curriculum))
+                self._checkpoint.mark_done(job.id)
+            except Exception as e:
+                print(
+                    f"Failed on `{job.job_description_path}` for "
+                    f"`{job.about_me_path}`: {e!r}",
+                    file=sys.stderr,
+                )
+                return False
+            return True
+
+        successes = await asyncio.gather(*(run_job(j) for j in pending_jobs))
+
+        done_count = sum(successes)
+        return BatchSummary(
+            done_count=done_count,
+            skipped_count=skipped_count,
+            failed_count=len(pending_jobs) - done_count,
+        )
+
+    def _find_near_duplicates(self, jobs: Sequence[BatchJob]) -> dict[str, str]:
+        assert self._near_duplicate_threshold is not None
+        about_me_path_to_id_to_text: dict[Path, dict[str, str]] = {}
+        for job in jobs:
+            try:
+                # NOTE: compared without boilerplate, shared by postings of a company
+                text = strip_boilerplate(job.job_description_path.read_text())
+            except OSError:
+                continue
+            about_me_path_to_id_to_text.setdefault(job.about_me_path, {})[job.id] = text
+
+        id_to_original_id: dict[str, str] = {}
+        for id_to_text in about_me_path_to_id_to_text.values():
+            id_to_original_id.update(
+                find_near_duplicates(id_to_text, self._near_duplicate_threshold)
+            )
+        return id_to_original_id
+
+
+def curriculum_record(job: BatchJob, curriculum: Curriculum) -> Json:
+    """
+    Create the record of the curriculum of a job, as appended to JSONL shards.
+    """
+    return {
+        "id": job.id,
+        "about_me": str(job.about_me_path),
+        "job_description": str(job.job_description_path),
+        "curriculum": curriculum.model_dump(mode="json"),
+    }
+
+
+def _append(path: Path, data: bytes) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        # NOTE: a single write in append mode is not interleaved with other writes
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _truncate_torn_line(path: Path) -> bytes:
+    """
+    Remove the last line of a file if it does not end with a newline, returning
+    the complete lines.
+    """
+    data = path.read_bytes()
+    complete_length = data.rfind(b"\n") + 1
+    if complete_length < len(data):
+        # NOTE: otherwise the next line appended would be joined to the torn one
+        os.truncate(path, complete_length)
+    return data[:complete_length]
@@ -0,0 +1,135 @@
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
+
+from apply_gpt.batch import (
+    BatchJob,
+    BatchSummary,
+    Checkpoint,
+    JsonlShards,
+    curriculum_record,
+)
+from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+from apply_gpt.data import AboutMe
+from apply_gpt.json_repair import repair_json
+from apply_gpt.openai_ import OpenaiJsonGenerator
+
+# Ref: https://platform.openai.com/docs/guides/batch
+
+_CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+
+def create_batch_requests(
+    curriculum_generator: OpenaiCurriculumGenerator,
+    model: str,
+    jobs: Iterable[BatchJob],
+    load_about_me: Callable[[Path], AboutMe],
+) -> Iterator[str]:
+    """
+    Create the lines of a Batch API input file, one request per job, identified by
+    the id of the job. Jobs listed more than once are requested once, as the Batch
+    API rejects files with duplicate ids.
+
+    :param curriculum_generator: the generator rendering the requests
+    :param model: the OpenAI model to request
+    :param jobs: the jobs to request curriculums of
+    :param load_about_me: the function loading a profile, called once per path
+    """
+    path_to_about_me: dict[Path, AboutMe] = {}
+    requested_ids: set[str] = set()
+    for job in jobs:
+        if job.id in requested_ids:
+            continue
+        requested_ids.add(job.id)
+        if job.about_me_path not in path_to_about_me:
+            path_to_about_me[job.about_me_path] = load_about_me(job.about_me_path)
+        rendered_request = curriculum_generator.render_request(
+            about_me=path_to_about_me[job.about_me_path],
+            job_description=job.job_description_path.read_text(),
+        )
+        body = {
+            "model": model,
+            **OpenaiJsonGenerator.create_request(
+                system_message=rendered_request.system_message,
+                user_message=rendered_request.user_message,
+                name=rendered_request.name,
+                schema=rendered_request.schema,
+            ),
+        }
+        yield json.dumps(
+            {
+                "custom_id": job.id,
+                "method": "POST",
+                "url": _CHAT_COMPLETIONS_URL,
+                "body": body,
+            },
+            separators=(",", ":"),
+        )
+
+
+def ingest_batch_results(
+    curriculum_generator: OpenaiCurriculumGenerator,
+    jobs: Sequence[BatchJob],
+    load_about_me: Callable[[Path], AboutMe],
+    result_lines: Iterable[str],
+    shards: JsonlShards,
+    checkpoint: Checkpoint,
+) -> BatchSummary:
+    """
+    Validate the curriculums of a Batch API output file, and store them like a
+    batch run would, so that the two can complete each other.
+
+    Results of jobs already done are skipped, while failed or invalid ones are
+    reported and left for another batch or run.
+
+    :param curriculum_generator: the generator that rendered the requests
+    :param jobs: the jobs of the requests, matched by id
+    :param load_about_me: the function loading a profile, called once per path
+    :param result_lines: the lines of the output file, e.g. an open file
+    :param shards: the shards to append the curriculums to
+    :param checkpoint: the checkpoint of the jobs done
+    """
+    id_to_job = {job.id: job for job in jobs}
+    path_to_about_me: dict[Path, AboutMe] = {}
+    done_count = 0
+    skipped_count = 0
+    failed_count = 0
+    for line_number, result_line in enumerate(result_lines, start=1):
+        if len(result_line.strip()) == 0:
+            continue
+        try:
+            result = json.loads(result_line)
+            job = id_to_job.get(result["custom_id"])
+            if job is None:
+                raise ValueError(f"No job with id `{result['custom_id']}`")
+            if checkpoint.is_done(job.id):
+                skipped_count += 1
+                continue
+
+            response = result.get("response") or {}
+            if result.get("error") is not None or response.get("status_code") != 200:
+                raise ValueError(
+                    f"Request failed: {result.get('error') or response.get('body')}"
+                )
+            message = response["body"]["choices"][0]["message"]
+            experience_json = repair_json(message["function_call"]["arguments"])
+
+            if job.about_me_path not in path_to_about_me:
+                path_to_about_me[job.about_me_path] = load_about_me(job.about_me_path)
+            curriculum = curriculum_generator.create_curriculum(
+                about_me=path_to_about_me[job.about_me_path],
+                experience_json=experience_json,
+            )
+        except Exception as e:
+            print(f"Failed on result at line {line_number}: {e!r}", file=sys.stderr)
+            failed_count += 1
+            continue
+
+        shards.append(job.id, curriculum_record(job, curriculum))
+        checkpoint.mark_done(job.id)
+        done_count += 1
+
+    return BatchSummary(
+        done_count=done_count, skipped_count=skipped_count, failed_count=failed_count
+    )
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+
+class DiskCache:
+    """
+    Content-addressed key-value store persisting one file per entry.
+
+    Entries expire `max_age` after being written. When `max_entries` or
+    `max_bytes` are exceeded, the least recently read entries are evicted first,
+    down to a fraction of the limits.
+    """
+
+    # NOTE: evicting below the limits lets many puts go by before the next scan of
+    # the whole directory, instead of scanning it at each put once the cache is full
+    EVICTION_TARGET = 0.9
+    # NOTE: the tracked size drifts with entries expiring or written by other
+    # processes, so the directory is also scanned after that many puts
+    SCAN_INTERVAL_PUTS = 1000
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        max_age: timedelta | None = None,
+    ) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._hits = 0
+        self._misses = 0
+        # NOTE: unknown until the first scan of the directory
+        self._entry_count: int | None = None
+        self._byte_count = 0
+        self._puts_since_scan = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """
+        Compute the key addressing the content made of the given parts.
+        """
+        hash_ = hashlib.sha256()
+        for part in parts:
+            encoded_part = part.encode()
+            # NOTE: length prefix avoids ambiguities like ("ab", "c") vs ("a", "bc")
+            hash_.update(len(encoded_part).to_bytes(8, "little"))
+            hash_.update(encoded_part)
+        return hash_.hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        entry_path = self._entry_path(key)
+        try:
+            stat = entry_path.stat()
+            if self._is_expired(stat.st_mtime):
+                entry_path.unlink(missing_ok=True)
+                self._track(-1, -stat.st_size)
+                raise FileNotFoundError(entry_path)
+            value = entry_path.read_bytes()
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+
+        # NOTE: access time tracks recency of use, modification time tracks age
+        os.utime(entry_path, (time.time(), stat.st_mtime))
+        self._hits += 1
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(exist_ok=True)
+        try:
+            replaced_size: int | None = entry_path.stat().st_size
+        except FileNotFoundError:
+            replaced_size = None
+
+        # NOTE: write then rename so that readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if replaced_size is None:
+            self._track(1, len(value))
+        else:
+            self._track(0, len(value) - replaced_size)
+        self._puts_since_scan += 1
+        if self._needs_eviction():
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove expired entries and, if limits are exceeded, least recently read ones
+        down to `EVICTION_TARGET` of the limits.
+        """
+        if (
+            self._max_entries is None
+            and self._max_bytes is None
+            and self._max_age is None
+        ):
+            return
+
+        entries: list[tuple[float, int, Path]] = []
+        for entry_path in self._path.glob("*/*"):
+            if entry_path.suffix == ".tmp":
+                continue
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            if self._is_expired(stat.st_mtime):
+                entry_path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry_path))
+
+        entries.sort()
+        entry_count = len(entries)
+        byte_count = sum(size for _, size, _ in entries)
+        if self._exceeds_limits(entry_count, byte_count, 1.0):
+            for _, size, entry_path in entries:
+                if not self._exceeds_limits(
+                    entry_count, byte_count, DiskCache.EVICTION_TARGET
+                ):
+                    break
+                entry_path.unlink(missing_ok=True)
+                entry_count -= 1
+                byte_count -= size
+
+        self._entry_count = entry_count
+        self._byte_count = byte_count
+        self._puts_since_scan = 0
+
+    def _track(self, entry_count_delta: int, byte_count_delta: int) -> None:
+        if self._entry_count is None:
+            return
+        self._entry_count += entry_count_delta
+        self._byte_count += byte_count_delta
+
+    def _needs_eviction(self) -> bool:
+        if (
+            self._max_entries is None
+            and self._max_bytes is None
+            and self._max_age is None
+        ):
+            return False
+        if (
+            self._entry_count is None
+            or self._puts_since_scan >= DiskCache.SCAN_INTERVAL_PUTS
+        ):
+            return True
+        return self._exceeds_limits(self._entry_count, self._byte_count, 1.0)
+
+    def _exceeds_limits(
+        self, entry_count: int, byte_count: int, limit_fraction: float
+    ) -> bool:
+        return (
+            self._max_entries is not None
+            and entry_count > self._max_entries * limit_fraction
+        ) or (
+            self._max_bytes is not None
+            and byte_count > self._max_bytes * limit_fraction
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self._path / key[:2] / key
+
+    def _is_expired(self, mtime: float) -> bool:
+        return self._max_age is not None and (
+            time.time() - mtime > self._max_age.total_seconds()
+        )
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Mapping, Sequence
+
+if TYPE_CHECKING:
+    from apply_gpt.cache import DiskCache
+    from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+    from apply_gpt.fake_openai import FakeArguments
+    from apply_gpt.metrics import Metrics
+    from apply_gpt.openai_ import ChatCompletionModule, JsonGenerator
+    from apply_gpt.scheduler import Priority, RequestScheduler
+    from apply_gpt.text_converter import TextConverter
+
+# NOTE: modules of apply_gpt are imported where they are used, as the scripts import
+# this module before parsing their arguments, and --help should not pay for openai
+OPENAI_ASSETS_PATH = Path(__file__).parent / "openai-assets"
+
+
+def add_openai_arguments(
+    parser: argparse.ArgumentParser, default_model: str | None = "gpt-4-0613"
+) -> None:
+    """
+    Add the arguments of the OpenAI model to call, see `create_openai_module`.
+
+    :param default_model: the model called if unset, or None not to call OpenAI API
+    """
+    parser.add_argument(
+        "--openai-model",
+        type=str,
+        default=default_model,
+        help=(
+            "The OpenAI model to use (more at https://platform.openai.com/docs/models)"
+            if default_model is not None
+            else "The OpenAI model to use (more at https://platform.openai.com/docs/"
+            "models), OpenAI API is not called if unset"
+        ),
+    )
+    parser.add_argument(
+        "--fake-openai",
+        action="store_true",
+        help="Reply with canned function calls locally instead of calling OpenAI API",
+    )
+
+
+def add_curriculum_prompt_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments of the prompts generating curriculums.
+    """
+    parser.add_argument(
+        "--openai-system-message",
+        type=Path,
+        default=OPENAI_ASSETS_PATH / "system-message.txt",
+        help="Path to the text file containing the system message for OpenAI API",
+    )
+    parser.add_argument(
+        "--openai-user-message-template",
+        type=Path,
+        default=None,
+        help=(
+            "Path to the text file containing the user message template for OpenAI API"
+        ),
+    )
+    parser.add_argument(
+        "--job-description-last",
+        action="store_true",
+        help=(
+            "Put the job description after the profile in the user message, so that "
+            "requests for the same profile share a prefix that prompt caches can reuse"
+        ),
+    )
+    parser.add_argument(
+        "--compact-schema",
+        action="store_true",
+        help=(
+            "Send a token-minimized schema of the curriculum, with repeated parts "
+            "referenced and descriptions stripped"
+        ),
+    )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments of the cache of OpenAI API responses, see `create_cache`.
+    """
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Path to the directory caching OpenAI API responses (no cache if unset)",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=None,
+        help="Number of days after which cached responses expire",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=float,
+        default=None,
+        help="Size in megabytes above which least recently used responses are evicted",
+    )
+
+
+def add_rate_limit_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments of the scheduling and retries of OpenAI API requests.
+    """
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=None,
+        help="Maximum number of OpenAI API requests per minute (no limit if unset)",
+    )
+    parser.add_argument(
+        "--tokens-per-minute",
+        type=float,
+        default=None,
+        help="Maximum number of OpenAI API tokens per minute (no limit if unset)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=6,
+        help="Maximum number of retries of OpenAI API requests on transient errors",
+    )
+
+
+def add_hedge_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments of the duplication of slow OpenAI API requests, see
+    `create_openai_curriculum_generator`.
+    """
+    parser.add_argument(
+        "--hedge-quantile",
+        type=float,
+        default=None,
+        help=(
+            "Quantile of recent OpenAI API latencies, e.g. 0.9, after which a "
+            "duplicate request is sent, keeping the first valid response (no "
+            "duplicates if unset)"
+        ),
+    )
+    parser.add_argument(
+        "--hedge-model",
+        type=str,
+        default=None,
+        help="OpenAI model of duplicate requests, e.g. a faster one (same if unset)",
+    )
+    parser.add_argument(
+        "--hedge-initial-deadline",
+        type=float,
+        default=None,
+        help=(
+            "Number of seconds after which a duplicate request is sent while too few "
+            "latencies are known for the quantile (no duplicates until then if unset)"
+        ),
+    )
+
+
+def user_message_template_path(path: Path | None, job_description_last: bool) -> Path:
+    """
+    Resolve the path of the user message template, defaulting to the one matching
+    the position of the job description.
+    """
+    if path is not None:
+        return path
+    return OPENAI_ASSETS_PATH / (
+        "user-message-template-job-last.txt"
+        if job_description_last
+        else "user-message-template.txt"
+    )
+
+
+def find_job_description_paths(pattern: str) -> Sequence[Path]:
+    """
+    Find the job description files at a path, in a directory or matching a glob
+    pattern, sorted by path.
+    """
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.is_file())
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(pattern) if Path(p).is_file())
+
+
+def create_cache(
+    cache_dir: Path | None,
+    cache_max_age: float | None = None,
+    cache_max_size: float | None = None,
+) -> DiskCache | None:
+    """
+    :param cache_max_age: the number of days after which entries expire
+    :param cache_max_size: the size in megabytes above which entries are evicted
+    """
+    from apply_gpt.cache import DiskCache
+
+    if cache_dir is None:
+        return None
+    return DiskCache(
+        path=cache_dir,
+        max_bytes=(
+            int(cache_max_size * 1024 * 1024) if cache_max_size is not None else None
+        ),
+        max_age=timedelta(days=cache_max_age) if cache_max_age is not None else None,
+    )
+
+
+def create_openai_module(
+    model: str,
+    fake_function_name_to_arguments: Mapping[str, FakeArguments] | None = None,
+    require_api_key: bool = True,
+) -> ChatCompletionModule:
+    """
+    :param fake_function_name_to_arguments: the canned arguments to reply with
+        locally by function, instead of calling OpenAI API, see `FakeOpenaiModule`
+    :param require_api_key: whether to fail without an OpenAI API key, unneeded
+        e.g. when only rendering requests
+    """
+    from apply_gpt.openai_ import OpenaiModule
+
+    if fake_function_name_to_arguments is not None:
+        from apply_gpt.fake_openai import FakeOpenaiModule
+
+        return FakeOpenaiModule(
+            function_name_to_arguments=fake_function_name_to_arguments, model=model
+        )
+    return OpenaiModule(
+        api_key=(
+            os.environ["OPENAI_API_KEY"]
+            if require_api_key
+            else os.environ.get("OPENAI_API_KEY", "")
+        ),
+        model=model,
+    )
+
+
+def create_openai_json_generator(
+    openai_module: ChatCompletionModule,
+    cache: DiskCache | None = None,
+    refresh_cache: bool = False,
+    request_scheduler: RequestScheduler | None = None,
+    priority: Priority | None = None,
+    max_retries: int = 6,
+    metrics: Metrics | None = None,
+) -> JsonGenerator:
+    """
+    :param refresh_cache: whether to ignore cached generations and overwrite them
+    :param priority: the priority of the requests in the scheduler, interactive if
+        unset
+    """
+    from apply_gpt.openai_ import CachedJsonGenerator, OpenaiJsonGenerator
+    from apply_gpt.scheduler import Priority, ScheduledChatCompletionModule
+
+    if request_scheduler is not None:
+        openai_module = ScheduledChatCompletionModule(
+            openai_module=openai_module,
+            request_scheduler=request_scheduler,
+            priority=priority if priority is not None else Priority.INTERACTIVE,
+            max_retries=max_retries,
+        )
+    json_generator: JsonGenerator = OpenaiJsonGenerator(
+        openai_module=openai_module, metrics=metrics
+    )
+    if cache is not None:
+        json_generator = CachedJsonGenerator(
+            json_generator=json_generator, cache=cache, refresh=refresh_cache
+        )
+    return json_generator
+
+
+def create_openai_curriculum_generator(
+    openai_module: ChatCompletionModule,
+    system_message_path: Path,
+    user_message_template_path: Path,
+    job_description_last: bool = False,
+    compact_schema: bool = False,
+    strip_boilerplate: bool = False,
+    by_section: bool = False,
+    cache: DiskCache | None = None,
+    refresh_cache: bool = False,
+    request_scheduler: RequestScheduler | None = None,
+    priority: Priority | None = None,
+    max_retries: int = 6,
+    max_repair_rounds: int = 1,
+    hedge_openai_module: ChatCompletionModule | None = None,
+    hedge_quantile: float | None = None,
+    hedge_initial_deadline: float | None = None,
+    metrics: Metrics | None = None,
+) -> OpenaiCurriculumGenerator:
+    """
+    :param hedge_openai_module: the module of the duplicates of slow requests, or
+        None to send them with `openai_module`
+    :param hedge_quantile: the quantile of recent latencies after which requests
+        are duplicated, or None not to duplicate them
+    """
+    from apply_gpt.curriculum_generator import (
+        OpenaiCurriculumGenerator,
+        validate_generated_json,
+    )
+    from apply_gpt.openai_ import HedgedJsonGenerator
+    from apply_gpt.text_converter import SimpleTextConverter
+
+    text_converter: TextConverter = SimpleTextConverter()
+
+    def create_json_generator(openai_module: ChatCompletionModule) -> JsonGenerator:
+        return create_openai_json_generator(
+            openai_module=openai_module,
+            cache=cache,
+            refresh_cache=refresh_cache,
+            request_scheduler=request_scheduler,
+            priority=priority,
+            max_retries=max_retries,
+            metrics=metrics,
+        )
+
+    openai_json_generator = create_json_generator(openai_module)
+    if hedge_quantile is not None:
+        # NOTE: duplicates to the same model share its generator, and its scheduler,
+        # while each generator has its cache, so that generations are keyed by the
+        # model that generated them, whichever request won
+        openai_json_generator = HedgedJsonGenerator(
+            json_generator=openai_json_generator,
+            hedge_json_generator=(
+                create_json_generator(hedge_openai_module)
+                if hedge_openai_module is not None
+                else None
+            ),
+            deadline_quantile=hedge_quantile,
+            initial_deadline=hedge_initial_deadline,
+            validate=validate_generated_json,
+            metrics=metrics,
+        )
+    system_message = system_message_path.read_text()
+    user_message_template = user_message_template_path.read_text()
+
+    openai_curriculum_generator = OpenaiCurriculumGenerator(
+        text_converter=text_converter,
+        openai_json_generator=openai_json_generator,
+        system_message=system_message,
+        user_message_template=user_message_template,
+        metrics=metrics,
+        job_description_last=job_description_last,
+        compact_schema=compact_schema,
+        max_repair_rounds=max_repair_rounds,
+        strip_job_description_boilerplate=strip_boilerplate,
+        generate_by_section=by_section,
+    )
+
+    return openai_curriculum_generator
@@ -1,8 +1,29 @@
-from typing import Protocol
+import asyncio
+import hashlib
+import json
+import re
+import weakref
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncGenerator, Callable, NamedTuple, Protocol
 
-from apply_gpt.data import AboutMe, Curriculum, Experience, Month
-from apply_gpt.openai_ import OpenaiJsonGenerator
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+
+from apply_gpt.data import (
+    AboutMe,
+    Curriculum,
+    Education,
+    Employment,
+    Experience,
+    Skillset,
+)
+from apply_gpt.job_description import strip_boilerplate
+from apply_gpt.metrics import Metrics, timed
+from apply_gpt.openai_ import JsonGenerator, OpenaiJsonGenerator, OpenaiTyping
+from apply_gpt.schema import model_schema, property_schema, schema_tokens
 from apply_gpt.text_converter import TextConverter
+from apply_gpt.utils import Json
 
 
 class CurriculumGenerator(Protocol):
@@ -11,6 +32,28 @@ class CurriculumGenerator(Protocol):
     ) -> Curriculum:
         ...
 
+    async def agenerate_curriculum(
+        self, about_me: AboutMe, job_description: str
+    ) -> Curriculum:
+        ...
+
+
+class RenderedRequest(NamedTuple):
+    """
+    The request to generate a curriculum, in the order the model reads it.
+
+    The shared prefix is the part of the request not depending on the job
+    description, i.e. the part that prompt caches can reuse across job descriptions
+    when generating curriculums of the same profile.
+    """
+
+    system_message: str
+    name: str
+    schema: OpenaiJsonGenerator.Schema
+    user_message: str
+    shared_prefix_chars: int
+    section: str | None = None
+
 
 class OpenaiCurriculumGenerator(CurriculumGenerator):
     EMPLOYMENTS_TOKEN = "{{EMPLOYMENTS}}"
@@ -20,10 +63,33 @@ class OpenaiCurriculumGenerator(CurriculumGenerator):
     def __init__(
         self,
         text_converter: TextConverter,
-        openai_json_generator: OpenaiJsonGenerator,
+        openai_json_generator: JsonGenerator,
         system_message: str,
         user_message_template: str,
+        metrics: Metrics | None = None,
+        job_description_last: bool = False,
+        compact_schema: bool = False,
+        max_repair_rounds: int = 1,
+        strip_job_description_boilerplate: bool = False,
+        generate_by_section: bool = False,
     ) -> None:
+        """
+        :param metrics: the metrics recording rendering and validation times
+        :param job_description_last: whether to require the job description token to
+            follow the other ones in the template, so that the whole profile is
+            part of the prefix shared by the requests for the same profile
+        :param compact_schema: whether to send the token-minimized schema of the
+            experience, see `model_schema`
+        :param max_repair_rounds: the maximum number of times the invalid entries of
+            a generated experience are generated again, alone, before giving up
+        :param strip_job_description_boilerplate: whether to remove the parts of job
+            descriptions not describing the job, see `strip_boilerplate`
+        :param generate_by_section: whether to generate the employments, educations
+            and skillsets of curriculums with separate requests, each leaving out the
+            parts of the profile the section does not depend on, so that after an
+            edit of the profile, a cache of generations only misses for the sections
+            depending on the edited part
+        """
         self._text_converter = text_converter
         self._openai_json_generator = openai_json_generator
         self._system_message = system_message
@@ -51,146 +117,529 @@ class OpenaiCurriculumGenerator(CurriculumGenerator):
                 f"{OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN} "
                 f"found {job_description_token_count} times"
             )
-        self._user_message_template = user_message_template
+        # NOTE: the template is split once at the tokens, so that rendering a user
+        # message is a single join of the literal parts and the substituted ones
+        self._user_message_parts = re.split(
+            f"({re.escape(OpenaiCurriculumGenerator.EMPLOYMENTS_TOKEN)}"
+            f"|{re.escape(OpenaiCurriculumGenerator.EDUCATIONS_TOKEN)}"
+            f"|{re.escape(OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN)})",
+            user_message_template,
+        )
+        self._employments_index = self._user_message_parts.index(
+            OpenaiCurriculumGenerator.EMPLOYMENTS_TOKEN
+        )
+        self._educations_index = self._user_message_parts.index(
+            OpenaiCurriculumGenerator.EDUCATIONS_TOKEN
+        )
+        self._job_description_index = self._user_message_parts.index(
+            OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN
+        )
+        if job_description_last and self._job_description_index < max(
+            self._employments_index, self._educations_index
+        ):
+            raise ValueError(
+                f"{OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN} should follow "
+                f"{OpenaiCurriculumGenerator.EMPLOYMENTS_TOKEN} and "
+                f"{OpenaiCurriculumGenerator.EDUCATIONS_TOKEN} in user message template"
+            )
+        self._compact_schema = compact_schema
+        self._max_repair_rounds = max_repair_rounds
+        self._strip_job_description_boilerplate = strip_job_description_boilerplate
+        self._experience_json_schema = model_schema(Experience, compact_schema)
+        self._experience_json_schema_tokens = schema_tokens(
+            self._experience_json_schema
+        )
+        self._generate_by_section = generate_by_section
+        self._section_json_schemas = {
+            section: property_schema(self._experience_json_schema, section)
+            for section in OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE
+        }
+        self._section_json_schema_tokens = {
+            section: schema_tokens(section_json_schema)
+            for section, section_json_schema in self._section_json_schemas.items()
+        }
+        self._section_to_system_prefix_chars = {
+            section: self._system_prefix_chars(
+                OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME, schema
+            )
+            for section, schema in (
+                (None, self._experience_json_schema),
+                *self._section_json_schemas.items(),
+            )
+        }
+        self._entry_json_schemas = {
+            key: model_schema(entry_type, compact_schema)
+            for key, entry_type in (
+                OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE.items()
+            )
+        }
+        self._about_me_keys: dict[int, tuple[weakref.ref[AboutMe], str]] = {}
+        self._about_me_texts: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self._metrics = metrics
 
     def generate_curriculum(
         self, about_me: AboutMe, job_description: str
     ) -> Curriculum:
-        employments = "\n".join(
-            self._text_converter.textify_employment(e) for e in about_me.employments
+        rendered_requests = self._render_requests(about_me, job_description)
+        experience_json = _merge_sections(
+            rendered_requests,
+            [
+                self._openai_json_generator.generate(
+                    system_message=rendered_request.system_message,
+                    user_message=rendered_request.user_message,
+                    name=rendered_request.name,
+                    schema=rendered_request.schema,
+                )
+                for rendered_request in rendered_requests
+            ],
         )
-        educations = "\n".join(
-            self._text_converter.textify_education(e) for e in about_me.educations
+        for _ in range(self._max_repair_rounds):
+            try:
+                return self.create_curriculum(about_me, experience_json)
+            except ValidationError as e:
+                repair_requests = self._render_repair_requests(
+                    rendered_requests, job_description, experience_json, e
+                )
+            repaired_entry_jsons = {
+                entry_key: self._openai_json_generator.generate(
+                    system_message=repair_request.system_message,
+                    user_message=repair_request.user_message,
+                    name=repair_request.name,
+                    schema=repair_request.schema,
+                )
+                for entry_key, repair_request in repair_requests.items()
+            }
+            experience_json = _replace_entries(experience_json, repaired_entry_jsons)
+        return self.create_curriculum(about_me, experience_json)
+
+    async def agenerate_curriculum(
+        self, about_me: AboutMe, job_description: str
+    ) -> Curriculum:
+        rendered_requests = self._render_requests(about_me, job_description)
+        experience_json = _merge_sections(
+            rendered_requests,
+            await asyncio.gather(
+                *(
+                    self._openai_json_generator.agenerate(
+                        system_message=rendered_request.system_message,
+                        user_message=rendered_request.user_message,
+                        name=rendered_request.name,
+                        schema=rendered_request.schema,
+                    )
+                    for rendered_request in rendered_requests
+                )
+            ),
         )
-        user_message = (
-            self._user_message_template.replace(
-                OpenaiCurriculumGenerator.EMPLOYMENTS_TOKEN, employments
+        for _ in range(self._max_repair_rounds):
+            try:
+                return self.create_curriculum(about_me, experience_json)
+            except ValidationError as e:
+                repair_requests = self._render_repair_requests(
+                    rendered_requests, job_description, experience_json, e
+                )
+            repaired_entry_jsons = await asyncio.gather(
+                *(
+                    self._openai_json_generator.agenerate(
+                        system_message=repair_request.system_message,
+                        user_message=repair_request.user_message,
+                        name=repair_request.name,
+                        schema=repair_request.schema,
+                    )
+                    for repair_request in repair_requests.values()
+                )
+            )
+            experience_json = _replace_entries(
+                experience_json, dict(zip(repair_requests, repaired_entry_jsons))
             )
-            .replace(OpenaiCurriculumGenerator.EDUCATIONS_TOKEN, educations)
-            .replace(OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN, job_description)
+        return self.create_curriculum(about_me, experience_json)
+
+    async def astream_experience(
+        self, about_me: AboutMe, job_description: str
+    ) -> AsyncGenerator[Employment | Education | Skillset, None]:
+        """
+        Stream the entries of the experience as soon as they are generated.
+
+        Each entry is validated as soon as it is complete, and an invalid entry
+        aborts the generation instead of waiting for the whole experience.
+        """
+        rendered_request = self.render_request(about_me, job_description)
+        items = self._openai_json_generator.astream_items(
+            system_message=rendered_request.system_message,
+            user_message=rendered_request.user_message,
+            name=rendered_request.name,
+            schema=rendered_request.schema,
         )
+        async with aclosing(items):
+            async for key, item_json in items:
+                entry_type = (
+                    OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE.get(key)
+                )
+                if entry_type is None:
+                    raise ValueError(f"Unexpected experience key `{key}`")
+                with timed(
+                    self._metrics,
+                    f"generate_{OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME}",
+                    "validation_seconds",
+                ):
+                    entry = entry_type.model_validate(item_json)
+                yield entry
 
-        experience_json = self._openai_json_generator.generate(
+    async def agenerate_curriculum_streaming(
+        self,
+        about_me: AboutMe,
+        job_description: str,
+        on_entry: Callable[[Employment | Education | Skillset], None] | None = None,
+    ) -> Curriculum:
+        """
+        Generate a curriculum by streaming its entries, see `astream_experience`.
+
+        :param on_entry: the callback called with each entry as soon as it is valid
+        """
+        employments: list[Employment] = []
+        educations: list[Education] = []
+        skillsets: list[Skillset] = []
+        entries = self.astream_experience(about_me, job_description)
+        async with aclosing(entries):
+            async for entry in entries:
+                if isinstance(entry, Employment):
+                    employments.append(entry)
+                elif isinstance(entry, Education):
+                    educations.append(entry)
+                else:
+                    skillsets.append(entry)
+                if on_entry is not None:
+                    on_entry(entry)
+
+        experience = Experience(
+            employments=employments, educations=educations, skillsets=skillsets
+        )
+        return Curriculum(private=about_me.private, experience=experience)
+
+    def render_request(
+        self, about_me: AboutMe, job_description: str, section: str | None = None
+    ) -> RenderedRequest:
+        """
+        Render the request to generate a curriculum, without sending it.
+
+        :param section: the key of the only section of the experience to request,
+            e.g. `employments`, leaving out the parts of the profile it does not
+            depend on (the whole experience if unset)
+        """
+        if (
+            section is not None
+            and section not in OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE
+        ):
+            raise ValueError(f"Unexpected experience key `{section}`")
+        function_name = f"generate_{OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME}"
+        with timed(self._metrics, function_name, "render_seconds"):
+            if self._strip_job_description_boilerplate:
+                stripped_job_description = strip_boilerplate(job_description)
+                if self._metrics is not None:
+                    self._metrics.record(
+                        function_name,
+                        "stripped_chars",
+                        len(job_description) - len(stripped_job_description),
+                    )
+                job_description = stripped_job_description
+            user_message_parts = self._render_user_message_parts(
+                about_me, job_description, section
+            )
+            user_message = "".join(user_message_parts)
+            shared_prefix_chars = self._section_to_system_prefix_chars[section] + sum(
+                len(p) for p in user_message_parts[: self._job_description_index]
+            )
+        if self._metrics is not None:
+            self._metrics.record(
+                function_name, "shared_prefix_chars", shared_prefix_chars
+            )
+            self._metrics.record(
+                function_name,
+                "schema_tokens",
+                self._experience_json_schema_tokens
+                if section is None
+                else self._section_json_schema_tokens[section],
+            )
+
+        # NOTE: sections are generated by the same function as the whole experience,
+        # with a schema restricted to the section, as the system message refers to it
+        return RenderedRequest(
             system_message=self._system_message,
-            user_message=user_message,
             name=OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME,
-            schema=OpenaiCurriculumGenerator._EXPERIENCE_JSON_SCHEMA,
+            schema=(
+                self._experience_json_schema
+                if section is None
+                else self._section_json_schemas[section]
+            ),
+            user_message=user_message,
+            shared_prefix_chars=shared_prefix_chars,
+            section=section,
         )
 
-        experience = Experience.model_validate(experience_json)
+    def _render_requests(
+        self, about_me: AboutMe, job_description: str
+    ) -> list[RenderedRequest]:
+        if not self._generate_by_section:
+            return [self.render_request(about_me, job_description)]
+        return [
+            self.render_request(about_me, job_description, section=section)
+            for section in OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE
+        ]
+
+    def _render_user_message_parts(
+        self, about_me: AboutMe, job_description: str, section: str | None = None
+    ) -> list[str]:
+        employments, educations = self._textify_about_me(about_me)
+        # NOTE: skillsets summarize the whole profile, the other sections their part
+        if section == "educations":
+            employments = ""
+        elif section == "employments":
+            educations = ""
+        user_message_parts = list(self._user_message_parts)
+        user_message_parts[self._employments_index] = employments
+        user_message_parts[self._educations_index] = educations
+        user_message_parts[self._job_description_index] = job_description
+        return user_message_parts
+
+    def _textify_about_me(self, about_me: AboutMe) -> tuple[str, str]:
+        key = self._about_me_key(about_me)
+        about_me_texts = self._about_me_texts.get(key)
+        if about_me_texts is not None:
+            self._about_me_texts.move_to_end(key)
+            return about_me_texts
+
+        employments = "\n".join(
+            self._text_converter.textify_employment(e) for e in about_me.employments
+        )
+        educations = "\n".join(
+            self._text_converter.textify_education(e) for e in about_me.educations
+        )
+        self._about_me_texts[key] = employments, educations
+        if len(self._about_me_texts) > OpenaiCurriculumGenerator._MAX_ABOUT_ME_TEXTS:
+            self._about_me_texts.popitem(last=False)
+        return employments, educations
+
+    def _about_me_key(self, about_me: AboutMe) -> str:
+        # NOTE: texts are keyed by content, so that equal profiles share them, while
+        # the content hash is computed once per profile, assuming it is not mutated
+        about_me_ref_key = self._about_me_keys.get(id(about_me))
+        if about_me_ref_key is not None and about_me_ref_key[0]() is about_me:
+            return about_me_ref_key[1]
+
+        key = hashlib.sha256(
+            about_me.model_dump_json(include={"employments", "educations"}).encode()
+        ).hexdigest()
+        self._about_me_keys = {
+            about_me_id: about_me_ref_key
+            for about_me_id, about_me_ref_key in self._about_me_keys.items()
+            if about_me_ref_key[0]() is not None
+        }
+        self._about_me_keys[id(about_me)] = weakref.ref(about_me), key
+        return key
+
+    def create_curriculum(self, about_me: AboutMe, experience_json: Json) -> Curriculum:
+        """
+        Validate a generated experience into a curriculum, e.g. one generated by a
+        request rendered with `render_request` and sent separately.
+        """
+        with timed(
+            self._metrics,
+            f"generate_{OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME}",
+            "validation_seconds",
+        ):
+            experience = Experience.model_validate(experience_json)
 
         curriculum = Curriculum(private=about_me.private, experience=experience)
 
         return curriculum
 
+    def _render_repair_requests(
+        self,
+        rendered_requests: list[RenderedRequest],
+        job_description: str,
+        experience_json: Json,
+        validation_error: ValidationError,
+    ) -> dict[tuple[str, int], RenderedRequest]:
+        """
+        Render the requests generating again each invalid entry of an experience,
+        keyed by the array and index of the entry, raising the validation error if
+        the experience cannot be repaired entry by entry.
+
+        The requests only send the job description, the invalid entry and its
+        errors, as the entry already carries the part of the profile it is about,
+        so that a repair costs a fraction of the original request.
+
+        :param rendered_requests: the requests that generated the experience, either
+            the whole of it or its sections
+        """
+        entry_key_to_errors: dict[tuple[str, int], list[ErrorDetails]] = {}
+        for error in validation_error.errors(include_url=False):
+            loc = error["loc"]
+            # NOTE: errors outside of entries, e.g. a missing array, need a full retry
+            if (
+                len(loc) < 2
+                or loc[0] not in OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE
+                or not isinstance(loc[1], int)
+            ):
+                raise validation_error
+            entry_key_to_errors.setdefault((str(loc[0]), loc[1]), []).append(error)
+
+        function_name = f"generate_{OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME}"
+        if self._metrics is not None:
+            self._metrics.record(
+                function_name, "repaired_entries", len(entry_key_to_errors)
+            )
+
+        if self._strip_job_description_boilerplate:
+            job_description = strip_boilerplate(job_description)
+        assert isinstance(experience_json, dict)
+        section_to_rendered_request = {r.section: r for r in rendered_requests}
+        repair_requests: dict[tuple[str, int], RenderedRequest] = {}
+        for (key, index), errors in entry_key_to_errors.items():
+            rendered_request = section_to_rendered_request.get(
+                key, section_to_rendered_request.get(None)
+            )
+            assert rendered_request is not None
+            entry_type = OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE[key]
+            entry_jsons = experience_json[key]
+            assert isinstance(entry_jsons, list)
+            error_lines = "\n".join(
+                f"- {'.'.join(str(p) for p in error['loc'][2:]) or 'entry'}: "
+                f"{error['msg']}"
+                for error in errors
+            )
+            name = entry_type.__name__.lower()
+            schema = self._entry_json_schemas[key]
+            repair_message_prefix = (
+                OpenaiCurriculumGenerator._REPAIR_MESSAGE_PREFIX_TEMPLATE.format(
+                    entry_name=name
+                )
+            )
+            repair_message_suffix = (
+                OpenaiCurriculumGenerator._REPAIR_MESSAGE_SUFFIX_TEMPLATE.format(
+                    entry_name=name,
+                    entry_json=json.dumps(entry_jsons[index]),
+                    error_lines=error_lines,
+                )
+            )
+            repair_requests[key, index] = RenderedRequest(
+                system_message=rendered_request.system_message,
+                name=name,
+                schema=schema,
+                user_message=(
+                    f"{repair_message_prefix}{job_description}{repair_message_suffix}"
+                ),
+                shared_prefix_chars=self._system_prefix_chars(name, schema)
+                + len(repair_message_prefix),
+                section=rendered_request.section,
+            )
+        return repair_requests
+
+    def _system_prefix_chars(
+        self, name: str, schema: OpenaiJsonGenerator.Schema
+    ) -> int:
+        # NOTE: functions are read by the model after the system message and before
+        # the user message, serialized the way OpenAI's python module does
+        function_signature: OpenaiTyping.Function.Signature = {
+            "name": f"generate_{name}",
+            "parameters": schema,
+        }
+        return len(self._system_message) + len(json.dumps(function_signature))
+
+    _MAX_ABOUT_ME_TEXTS = 16
+
     _EXPERIENCE_JSON_NAME = "curriculum"
 
-    # NOTE: Possible solutions to move this to file for easier prompt engineering
-    # 1) Move to file only the descriptions of the fields
-    # 2) Extract to a file the way to map Curriculum schema to Curriculum object
-    _EXPERIENCE_JSON_SCHEMA: OpenaiJsonGenerator.Schema = {
-        "type": "object",
-        "required": ("employments", "educations", "skillsets"),
-        "description": "The curriculum to generate",
-        "properties": {
-            "employments": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": (
-                        "role",
-                        "company",
-                        "start_date",
-                        "achievements",
-                    ),
-                    "properties": {
-                        "role": {"type": "string"},
-                        "company": {"type": "string"},
-                        "start_date": {
-                            "type": "object",
-                            "required": ("year",),
-                            "properties": {
-                                "year": {"type": "number"},
-                                "month": {
-                                    "type": "string",
-                                    "enum": [m.value for m in Month],
-                                },
-                            },
-                        },
-                        "end_date": {
-                            "type": "object",
-                            "required": ("year",),
-                            "properties": {
-                                "year": {"type": "number"},
-                                "month": {
-                                    "type": "string",
-                                    "enum": [m.value for m in Month],
-                                },
-                            },
-                        },
-                        "achievements": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                        },
-                    },
-                },
-            },
-            "educations": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": (
-                        "degree",
-                        "institution",
-                        "start_date",
-                        "achievements",
-                    ),
-                    "properties": {
-                        "degree": {"type": "string"},
-                        "institution": {"type": "string"},
-                        "grade": {"type": "string"},
-                        "start_date": {
-                            "type": "object",
-                            "required": ("year",),
-                            "properties": {
-                                "year": {"type": "number"},
-                                "month": {
-                                    "type": "string",
-                                    "enum": [m.value for m in Month],
-                                },
-                            },
-                        },
-                        "end_date": {
-                            "type": "object",
-                            "required": ("year",),
-                            "properties": {
-                                "year": {"type": "number"},
-                                "month": {
-                                    "type": "string",
-                                    "enum": [m.value for m in Month],
-                                },
-                            },
-                        },
-                        "achievements": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                        },
-                    },
-                },
-            },
-            "skillsets": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": ("name", "skills"),
-                    "properties": {
-                        "name": {"type": "string"},
-                        "skills": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                        },
-                    },
-                },
-            },
-        },
+    # NOTE: the job description precedes the entry, so that the repairs of entries
+    # of the same type share a prefix
+    _REPAIR_MESSAGE_PREFIX_TEMPLATE = (
+        "One {entry_name} of a curriculum tailored to the job description below "
+        "is invalid.\n"
+        "Job description:\n"
+    )
+
+    _REPAIR_MESSAGE_SUFFIX_TEMPLATE = (
+        "\n\n"
+        "Invalid {entry_name}:\n"
+        "{entry_json}\n"
+        "It has the following errors:\n"
+        "{error_lines}\n"
+        "Generate this {entry_name} again, fixing the errors, and keeping it "
+        "tailored to the job description."
+    )
+
+    _EXPERIENCE_KEY_TO_ENTRY_TYPE: dict[
+        str, type[Employment | Education | Skillset]
+    ] = {
+        "employments": Employment,
+        "educations": Education,
+        "skillsets": Skillset,
     }
+
+
+def validate_generated_json(name: str, generated_json: Json) -> None:
+    """
+    Validate an object generated by the requests of `OpenaiCurriculumGenerator`,
+    i.e. a whole experience, a section of it or one of its entries, e.g. to prefer
+    valid generations over invalid ones.
+
+    :param name: the name of the type of generated object, as requested
+    :raise ValueError: if the object is invalid
+    """
+    if name != OpenaiCurriculumGenerator._EXPERIENCE_JSON_NAME:
+        entry_type = _ENTRY_NAME_TO_TYPE.get(name)
+        if entry_type is None:
+            raise ValueError(f"Unexpected name `{name}`")
+        entry_type.model_validate(generated_json)
+        return
+
+    # NOTE: the sections present are validated, as sections may be requested alone
+    if not isinstance(generated_json, dict) or len(generated_json) == 0:
+        raise ValueError("Generated experience is not an object with sections")
+    for key, entry_jsons in generated_json.items():
+        entry_type = OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE.get(key)
+        if entry_type is None:
+            raise ValueError(f"Unexpected experience key `{key}`")
+        if not isinstance(entry_jsons, list):
+            raise ValueError(f"Generated {key} are not an array")
+        for entry_json in entry_jsons:
+            entry_type.model_validate(entry_json)
+
+
+_ENTRY_NAME_TO_TYPE = {
+    entry_type.__name__.lower(): entry_type
+    for entry_type in OpenaiCurriculumGenerator._EXPERIENCE_KEY_TO_ENTRY_TYPE.values()
+}
+
+
+def _merge_sections(
+    rendered_requests: list[RenderedRequest], generated_jsons: list[Json]
+) -> Json:
+    """
+    Merge the sections of an experience generated by the given requests, leaving
+    out the sections generated with another type, to fail their validation.
+    """
+    if len(rendered_requests) == 1 and rendered_requests[0].section is None:
+        return generated_jsons[0]
+
+    experience_json: dict[str, Json] = {}
+    for rendered_request, generated_json in zip(rendered_requests, generated_jsons):
+        section = rendered_request.section
+        assert section is not None
+        if isinstance(generated_json, dict) and section in generated_json:
+            experience_json[section] = generated_json[section]
+    return experience_json
+
+
+def _replace_entries(
+    experience_json: Json, entry_key_to_json: dict[tuple[str, int], Json]
+) -> Json:
+    assert isinstance(experience_json, dict)
+    replaced_experience_json = dict(experience_json)
+    for key in {key for key, _ in entry_key_to_json}:
+        entry_jsons = replaced_experience_json[key]
+        assert isinstance(entry_jsons, list)
+        replaced_experience_json[key] = [
+            entry_key_to_json.get((key, index), entry_json)
+            for index, entry_json in enumerate(entry_jsons)
+        ]
+    return replaced_experience_json
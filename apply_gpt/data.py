@@ -1,8 +1,15 @@
 import re
 from enum import Enum
-from typing import Any, ClassVar, Pattern, Sequence
+from typing import Any, ClassVar, Pattern, cast
 
-from pydantic import BaseModel, NonNegativeInt, root_validator, validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    NonNegativeInt,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
 
 
 class Private(BaseModel):
@@ -29,13 +36,17 @@ class Month(Enum):
     DECEMBER = "december"
 
 
+_MONTH_TO_ORDINAL = {m: i for i, m in enumerate(Month)}
+
+
 class Date(BaseModel):
     year: NonNegativeInt
 
     _DATE_REGEX: ClassVar[Pattern[str]] = re.compile(r"(\d+)")
 
-    @root_validator(pre=True)
-    def parse_str(cls, root: Any) -> dict:
+    @model_validator(mode="before")
+    @classmethod
+    def parse_str(cls, root: Any) -> Any:
         if not isinstance(root, str):
             return root
 
@@ -56,8 +67,9 @@ class DetailedDate(Date):
         rf"({'|'.join(m.value for m in Month)}) +(\d+)"
     )
 
-    @root_validator(pre=True)
-    def parse_str(cls, root: Any) -> dict:
+    @model_validator(mode="before")
+    @classmethod
+    def parse_str(cls, root: Any) -> Any:
         if not isinstance(root, str):
             return root
 
@@ -81,8 +93,8 @@ def is_before(date_a: Date, date_b: Date) -> bool | None:
     if not isinstance(date_a, DetailedDate) or not isinstance(date_b, DetailedDate):
         return None
 
-    end_month_index = list(Month).index(date_a.month)
-    start_month_index = list(Month).index(date_b.month)
+    end_month_index = _MONTH_TO_ORDINAL[date_a.month]
+    start_month_index = _MONTH_TO_ORDINAL[date_b.month]
 
     if end_month_index < start_month_index:
         return True
@@ -92,22 +104,30 @@ def is_before(date_a: Date, date_b: Date) -> bool | None:
     return None
 
 
+def _require_achievements(schema: dict[str, Any]) -> None:
+    # NOTE: optional in profiles, while generated entries should always have them
+    cast(list[str], schema["required"]).append("achievements")
+
+
 class Employment(BaseModel):
+    model_config = ConfigDict(json_schema_extra=_require_achievements)
+
     role: str
     company: str
     start_date: DetailedDate | Date
     end_date: DetailedDate | Date | None = None
-    achievements: Sequence[str] | None = None
+    achievements: list[str] | None = None
 
-    @validator("end_date")
+    @field_validator("end_date")
+    @classmethod
     def end_after_start(
-        cls, end_date: Date | None, values: dict[str, Any]
+        cls, end_date: Date | None, info: ValidationInfo
     ) -> Date | None:
-        if end_date is None:
+        # NOTE: start date is missing when it failed validation
+        start_date: Date | None = info.data.get("start_date")
+        if end_date is None or start_date is None:
             return end_date
 
-        start_date: Date = values["start_date"]
-
         if is_before(end_date, start_date) is True:
             raise ValueError(f"End date before start date: {end_date} < {start_date}")
 
@@ -115,22 +135,25 @@ class Employment(BaseModel):
 
 
 class Education(BaseModel):
+    model_config = ConfigDict(json_schema_extra=_require_achievements)
+
     degree: str
     institution: str
     grade: str | None = None
     start_date: DetailedDate | Date
     end_date: DetailedDate | Date | None = None
-    achievements: Sequence[str] | None = None
+    achievements: list[str] | None = None
 
-    @validator("end_date")
+    @field_validator("end_date")
+    @classmethod
     def end_after_start(
-        cls, end_date: Date | None, values: dict[str, Any]
+        cls, end_date: Date | None, info: ValidationInfo
     ) -> Date | None:
-        if end_date is None:
+        # NOTE: start date is missing when it failed validation
+        start_date: Date | None = info.data.get("start_date")
+        if end_date is None or start_date is None:
             return end_date
 
-        start_date: Date = values["start_date"]
-
         if is_before(end_date, start_date) is True:
             raise ValueError(f"End date before start date: {end_date} < {start_date}")
 
@@ -139,19 +162,23 @@ class Education(BaseModel):
 
 class AboutMe(BaseModel):
     private: Private
-    employments: Sequence[Employment]
-    educations: Sequence[Education]
+    employments: list[Employment]
+    educations: list[Education]
 
 
 class Skillset(BaseModel):
     name: str
-    skills: Sequence[str]
+    skills: list[str]
 
 
 class Experience(BaseModel):
-    employments: Sequence[Employment]
-    educations: Sequence[Education]
-    skillsets: Sequence[Skillset]
+    model_config = ConfigDict(
+        json_schema_extra={"description": "The curriculum to generate"}
+    )
+
+    employments: list[Employment]
+    educations: list[Education]
+    skillsets: list[Skillset]
 
 
 class Curriculum(BaseModel):
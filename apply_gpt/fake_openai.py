@@ -0,0 +1,316 @@
+import asyncio
+import json
+import math
+import random
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    TypeAlias,
+)
+
+import openai
+
+from apply_gpt.data import AboutMe, Education, Employment
+from apply_gpt.openai_ import ChatCompletionModule, OpenaiTyping
+from apply_gpt.utils import Json, estimate_tokens
+
+# NOTE: arguments are either canned, or created from the user message of the call
+FakeArguments: TypeAlias = Json | Callable[[str], Json]
+
+
+class FakeOpenaiModule(ChatCompletionModule):
+    """
+    Local stand-in for OpenAI's API replying with canned function calls.
+
+    Replies take a random latency and fail at random with the errors OpenAI's python
+    module raises, so that the code around model calls can be exercised offline.
+    """
+
+    def __init__(
+        self,
+        function_name_to_arguments: Mapping[str, FakeArguments],
+        latency: Callable[[random.Random], float] | None = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float | None = None,
+        model: str = "fake",
+        seed: int | None = None,
+        stream_chunk_chars: int = 16,
+    ) -> None:
+        """
+        :param function_name_to_arguments: the arguments to reply with by function,
+            or the functions creating them from the user message
+        :param latency: the distribution of the latency in seconds, zero by default
+        :param error_rate: the probability of replying with a server error
+        :param rate_limit_rate: the probability of replying with a rate limit error
+        :param retry_after: the number of seconds to retry after, given by the
+            `retry-after` header of rate limit errors (no header if unset)
+        :param model: the name of the model being faked
+        :param seed: the seed of the random generator of latencies and errors
+        :param stream_chunk_chars: the number of characters of each streamed chunk
+        """
+        self._function_name_to_arguments = function_name_to_arguments
+        self._latency = latency
+        self._error_rate = error_rate
+        self._rate_limit_rate = rate_limit_rate
+        self._retry_after = retry_after
+        self._model = model
+        self._random = random.Random(seed)
+        self._stream_chunk_chars = stream_chunk_chars
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def chat_completion_create(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        time.sleep(self._sample_latency())
+        return self._reply(messages, functions, function_call)
+
+    async def chat_completion_acreate(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        await asyncio.sleep(self._sample_latency())
+        return self._reply(messages, functions, function_call)
+
+    async def chat_completion_astream(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> AsyncGenerator[Any, None]:
+        latency = self._sample_latency()
+        completion = self._reply(messages, functions, function_call)
+        arguments: str = completion.choices[0].message.function_call.arguments
+        chunk_count = max(math.ceil(len(arguments) / self._stream_chunk_chars), 1)
+        for i in range(chunk_count):
+            await asyncio.sleep(latency / chunk_count)
+            arguments_delta = arguments[
+                i * self._stream_chunk_chars : (i + 1) * self._stream_chunk_chars
+            ]
+            yield openai.openai_object.OpenAIObject.construct_from(
+                {
+                    "object": "chat.completion.chunk",
+                    "model": self._model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"function_call": {"arguments": arguments_delta}},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+            )
+
+    def create_batch_results(self, request_lines: Iterable[str]) -> Iterator[str]:
+        """
+        Reply to the requests of a Batch API input file with the lines of its output
+        file, so that batches can be exercised offline.
+
+        Errors are reported in the lines like the Batch API does, and latencies are
+        not simulated, as batches complete hours later anyway.
+        """
+        for index, request_line in enumerate(request_lines):
+            if len(request_line.strip()) == 0:
+                continue
+            request = json.loads(request_line)
+            body = request["body"]
+            try:
+                completion = self._reply(
+                    body["messages"], body["functions"], body["function_call"]
+                )
+                response = {"status_code": 200, "body": completion.to_dict_recursive()}
+            except openai.error.OpenAIError as e:
+                response = {
+                    "status_code": e.http_status,
+                    "body": {"error": {"message": e.user_message}},
+                }
+            yield json.dumps(
+                {
+                    "id": f"batch_req_{index}",
+                    "custom_id": request["custom_id"],
+                    "response": response,
+                    "error": None,
+                }
+            )
+
+    def _sample_latency(self) -> float:
+        if self._latency is None:
+            return 0.0
+        return max(self._latency(self._random), 0.0)
+
+    def _reply(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+    ) -> Any:
+        outcome = self._random.random()
+        if outcome < self._error_rate:
+            raise openai.error.ServiceUnavailableError(
+                "Fake server error", http_status=503
+            )
+        if outcome < self._error_rate + self._rate_limit_rate:
+            raise openai.error.RateLimitError(
+                "Fake rate limit",
+                http_status=429,
+                headers=(
+                    {"retry-after": str(self._retry_after)}
+                    if self._retry_after is not None
+                    else None
+                ),
+            )
+
+        function_name = function_call["name"]
+        arguments_json = self._function_name_to_arguments[function_name]
+        if callable(arguments_json):
+            arguments_json = arguments_json(messages[-1]["content"])
+        arguments = json.dumps(arguments_json)
+        prompt_tokens = sum(
+            estimate_tokens(m["content"]) for m in messages
+        ) + estimate_tokens(json.dumps(functions))
+        completion_tokens = estimate_tokens(arguments)
+
+        return openai.openai_object.OpenAIObject.construct_from(
+            {
+                "object": "chat.completion",
+                "model": self._model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "function_call": {
+                                "name": function_name,
+                                "arguments": arguments,
+                            },
+                        },
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+
+
+def lognormal_latency(median: float, sigma: float) -> Callable[[random.Random], float]:
+    """
+    Create a log-normal latency distribution, the usual shape of API latencies.
+
+    :param median: the median latency in seconds
+    :param sigma: the standard deviation of the logarithm of the latency
+    """
+
+    def sample(random_: random.Random) -> float:
+        return median * random_.lognormvariate(0.0, sigma)
+
+    return sample
+
+
+def create_experience_json(about_me: AboutMe, max_achievements: int = 3) -> Json:
+    """
+    Create the arguments of a plausible curriculum generation from a profile.
+    """
+    return {
+        "employments": [
+            _create_entry_json(e, max_achievements) for e in about_me.employments
+        ],
+        "educations": [
+            _create_entry_json(e, max_achievements) for e in about_me.educations
+        ],
+        "skillsets": [
+            {"name": "Languages", "skills": ["Python", "C++", "SQL"]},
+            {"name": "ML", "skills": ["PyTorch", "NLP", "Computer Vision"]},
+        ],
+    }
+
+
+def create_function_name_to_arguments(
+    about_me: AboutMe, max_achievements: int = 3
+) -> dict[str, Json]:
+    """
+    Create the arguments of plausible calls of the functions generating a curriculum
+    from a profile, i.e. the whole experience and each type of entry, as generated
+    again alone when invalid.
+    """
+    experience_json = create_experience_json(about_me, max_achievements)
+    assert isinstance(experience_json, dict)
+    function_name_to_arguments: dict[str, Json] = {
+        "generate_curriculum": experience_json
+    }
+    for key, entry_name in (
+        ("employments", "employment"),
+        ("educations", "education"),
+        ("skillsets", "skillset"),
+    ):
+        entry_jsons = experience_json[key]
+        assert isinstance(entry_jsons, list)
+        if len(entry_jsons) > 0:
+            function_name_to_arguments[f"generate_{entry_name}"] = entry_jsons[0]
+    return function_name_to_arguments
+
+
+def create_tuning_function_name_to_arguments() -> dict[str, FakeArguments]:
+    """
+    Create the arguments of plausible calls of the functions tuning achievements,
+    sorting the achievements as sent and rewording them as they are.
+    """
+
+    def create_achievements_skills_json(user_message: str) -> Json:
+        id_to_achievement = _trailing_json(user_message)
+        assert isinstance(id_to_achievement, dict)
+        return {
+            "achievements": [
+                {"id": id_, "skills": ["Python", "SQL"]} for id_ in id_to_achievement
+            ]
+        }
+
+    def create_sorted_ids_json(user_message: str) -> Json:
+        id_to_skills = _trailing_json(user_message)
+        assert isinstance(id_to_skills, dict)
+        return {"sorted_ids": list(id_to_skills)}
+
+    def create_reworded_achievements_json(user_message: str) -> Json:
+        return {"reworded_achievements": _trailing_json(user_message)}
+
+    return {
+        "generate_requirements": {"requirements": ["Python", "SQL", "PyTorch"]},
+        "generate_achievements_skills": create_achievements_skills_json,
+        "generate_sorted_ids": create_sorted_ids_json,
+        "generate_reworded_achievements": create_reworded_achievements_json,
+    }
+
+
+def _trailing_json(text: str) -> Json:
+    # NOTE: messages end with JSON indented by `json.dumps`, so its value starts at
+    # the last line opening an object or an array without indentation
+    start = max(text.rfind("\n{"), text.rfind("\n["))
+    trailing_json: Json = json.loads(text[start + 1 :])
+    return trailing_json
+
+
+def _create_entry_json(entry: Employment | Education, max_achievements: int) -> Json:
+    entry_json: dict[str, Any] = entry.model_dump(mode="json", exclude_none=True)
+    entry_json["achievements"] = list(entry.achievements or ())[:max_achievements]
+    return entry_json
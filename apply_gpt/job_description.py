@@ -0,0 +1,66 @@
+import re
+
+# NOTE: sections under these headings are boilerplate as a whole
+_BOILERPLATE_HEADING = re.compile(
+    r"(benefits|perks|what we offer|equal (employment )?opportunit\w*|eeo\b|"
+    r"diversity|compensation|salary|pay range|privacy|accommodations?|how to apply)",
+    re.IGNORECASE,
+)
+# NOTE: sections under these headings introduce the company, then often the role
+_COMPANY_HEADING = re.compile(
+    r"(our company|about (us|the company)|who we are|company (overview|description))",
+    re.IGNORECASE,
+)
+_BOILERPLATE_PARAGRAPH = re.compile(
+    r"equal (employment )?opportunit|regardless of|reasonable accommodation|"
+    r"protected veteran|sexual orientation|gender identity|e-verify|background check|"
+    r"privacy (policy|notice)|pay transparency|benefits (include|package)",
+    re.IGNORECASE,
+)
+_ROLE_CUE = re.compile(
+    r"\b(team|role|position|you will|you'll|looking for|responsibilit)",
+    re.IGNORECASE,
+)
+_MAX_HEADING_WORDS = 8
+
+
+def strip_boilerplate(job_description: str) -> str:
+    """
+    Remove the parts of a job description not describing the job, e.g. equal
+    opportunity statements, benefits, and introductions of the company.
+
+    Paragraphs are removed when they read like boilerplate, or when they are in a
+    section whose heading announces boilerplate. Paragraphs introducing the company
+    are removed until one mentions the role or the team.
+    """
+    kept_paragraphs: list[str] = []
+    section = ""
+    for paragraph in re.split(r"\n\s*\n", job_description.strip()):
+        lines = paragraph.strip().split("\n")
+        if _is_heading(lines[0]):
+            section = (
+                "boilerplate"
+                if _BOILERPLATE_HEADING.match(lines[0].strip())
+                else "company"
+                if _COMPANY_HEADING.match(lines[0].strip())
+                else ""
+            )
+            if section != "":
+                lines = lines[1:]
+
+        body = "\n".join(lines)
+        if section == "company" and _ROLE_CUE.search(body):
+            section = ""
+        if section != "" or _BOILERPLATE_PARAGRAPH.search(body) or len(lines) == 0:
+            continue
+        kept_paragraphs.append(body.strip())
+    return "\n\n".join(kept_paragraphs)
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    return (
+        0 < len(line.split()) <= _MAX_HEADING_WORDS
+        and line[-1] not in ".!?,;"
+        and not line.startswith(("•", "-", "*"))
+    )
@@ -0,0 +1,141 @@
+import json
+
+from apply_gpt.utils import Json
+
+_LITERALS = {
+    "true": "true",
+    "false": "false",
+    "null": "null",
+    "True": "true",
+    "False": "false",
+    "None": "null",
+}
+
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def repair_json(text: str) -> Json:
+    """
+    Parse JSON generated by a model, repairing the most common errors if needed.
+
+    The repaired errors are text around the JSON value like markdown fences, single
+    quotes, raw newlines in strings, trailing commas, Python literals, and values
+    truncated, e.g. by the maximum number of tokens. Truncated values are closed,
+    dropping their last member if it cannot be completed.
+
+    :param text: the generated text
+    :raise json.JSONDecodeError: if the text is malformed beyond repair
+    """
+    try:
+        parsed_json: Json = json.loads(text)
+        return parsed_json
+    except json.JSONDecodeError as e:
+        error = e
+
+    repaired_text, closers = _repair(text)
+    if repaired_text is None:
+        raise error
+    # NOTE: candidates from the least to the most lossy completion of truncated text
+    candidates = [repaired_text]
+    if len(closers) > 0:
+        candidates.append(f"{repaired_text}:null")
+        last_comma_index = repaired_text.rfind(",")
+        if last_comma_index >= 0:
+            candidates.append(repaired_text[:last_comma_index])
+    for candidate in candidates:
+        try:
+            parsed_json = json.loads(candidate + closers)
+            return parsed_json
+        except json.JSONDecodeError:
+            continue
+    raise error
+
+
+def _repair(text: str) -> tuple[str | None, str]:
+    """
+    Rewrite text into JSON, returning it without the closers of the arrays and
+    objects left open by a truncation, and those closers.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None, ""
+
+    chars: list[str] = []
+    closers: list[str] = []
+    quote: str | None = None
+    escaped = False
+    index = start
+    while index < len(text):
+        char = text[index]
+        index += 1
+
+        if quote is not None:
+            if escaped:
+                if char == "'":
+                    # NOTE: JSON has no escaped single quote, it needs no escape
+                    chars[-1] = char
+                else:
+                    chars.append(char)
+                escaped = False
+            elif char == "\\":
+                chars.append(char)
+                escaped = True
+            elif char == quote:
+                chars.append('"')
+                quote = None
+            elif char == '"':
+                chars.append('\\"')
+            else:
+                chars.append(_STRING_ESCAPES.get(char, char))
+            continue
+
+        if char in "\"'":
+            chars.append('"')
+            quote = char
+        elif char in "{[":
+            chars.append(char)
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if len(closers) == 0:
+                break
+            _strip_trailing_comma(chars)
+            # NOTE: the expected closer, as mismatched ones are typos
+            chars.append(closers.pop())
+            if len(closers) == 0:
+                # NOTE: whatever follows the value is not part of it
+                break
+        elif char.isalpha():
+            word_end = index
+            while word_end < len(text) and (
+                text[word_end].isalnum() or text[word_end] == "_"
+            ):
+                word_end += 1
+            word = text[index - 1 : word_end]
+            if word_end == len(text):
+                # NOTE: a literal truncated at the end of the text is completed
+                word = next((lit for lit in _LITERALS if lit.startswith(word)), word)
+            chars.append(_LITERALS.get(word, word))
+            index = word_end
+        else:
+            chars.append(char)
+
+    if quote is not None:
+        if escaped:
+            chars.pop()
+        chars.append('"')
+    if len(closers) > 0:
+        # NOTE: a number truncated after its sign, point or exponent is cut there
+        while len(chars) > 0 and (chars[-1].isspace() or chars[-1] in "-+.eE"):
+            chars.pop()
+        _strip_trailing_comma(chars)
+        if len(chars) > 0 and chars[-1] == ":":
+            chars.append("null")
+    return "".join(chars), "".join(reversed(closers))
+
+
+def _strip_trailing_comma(chars: list[str]) -> None:
+    end = len(chars)
+    while end > 0 and chars[end - 1].isspace():
+        end -= 1
+    if end > 0 and chars[end - 1] == ",":
+        del chars[end - 1 :]
@@ -0,0 +1,97 @@
+import json
+from typing import Sequence
+
+from apply_gpt.utils import Json
+
+
+class JsonItemStream:
+    """
+    Incrementally parses a JSON object whose values are arrays, such as a curriculum.
+
+    Text is fed as it is generated, and each array item that is an object or an
+    array is returned as soon as it is complete, along with the key of its array.
+    Structural errors are raised as soon as they are fed.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []
+        self._position = 0
+        self._closers: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._root_string_chars: list[str] = []
+        self._last_root_string: str | None = None
+        self._key: str | None = None
+        self._item_chars: list[str] = []
+        self._done = False
+
+    def feed(self, text: str) -> Sequence[tuple[str, Json]]:
+        """
+        Feed the next chunk of text, returning the items it completes.
+        """
+        items: list[tuple[str, Json]] = []
+        for char in text:
+            item = self._feed_char(char)
+            if item is not None:
+                items.append(item)
+            self._position += 1
+        self._chunks.append(text)
+        return items
+
+    def close(self) -> Json:
+        """
+        Check that the fed text is complete and return the whole parsed object.
+        """
+        if not self._done:
+            raise ValueError("Incomplete JSON object")
+        parsed_json: Json = json.loads("".join(self._chunks))
+        return parsed_json
+
+    def _feed_char(self, char: str) -> tuple[str, Json] | None:
+        # NOTE: depth 1 is the root object, 2 its arrays and 3 their items
+        depth = len(self._closers)
+        if depth >= 3:
+            self._item_chars.append(char)
+
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if depth == 1:
+                    self._last_root_string = json.loads(
+                        f'"{"".join(self._root_string_chars)}"'
+                    )
+                return None
+            if depth == 1:
+                self._root_string_chars.append(char)
+            return None
+
+        if char.isspace():
+            return None
+        if self._done:
+            raise ValueError(f"Unexpected `{char}` after the end at {self._position}")
+        if depth == 0 and char != "{":
+            raise ValueError(f"Expected a JSON object at {self._position}")
+
+        if char == '"':
+            self._in_string = True
+            self._root_string_chars.clear()
+        elif char in "{[":
+            if depth == 2:
+                self._item_chars = [char]
+            self._closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if self._closers[-1] != char:
+                raise ValueError(f"Unexpected `{char}` at {self._position}")
+            self._closers.pop()
+            if depth == 1:
+                self._done = True
+            elif depth == 3 and self._key is not None:
+                return self._key, json.loads("".join(self._item_chars))
+        elif char == ":" and depth == 1:
+            self._key = self._last_root_string
+
+        return None
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import pickle
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+import yaml
+
+from apply_gpt.cache import DiskCache
+
+if TYPE_CHECKING:
+    from apply_gpt.data import AboutMe
+
+# NOTE: the C loader is only available when PyYAML is built against libyaml
+_YAML_LOADER: Any = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+
+def load_yaml(text: str) -> Any:
+    """
+    Parse YAML text, with the libyaml C loader when available.
+    """
+    return yaml.load(text, Loader=_YAML_LOADER)
+
+
+def load_about_me(path: Path, snapshot_cache: DiskCache | None = None) -> AboutMe:
+    """
+    Load and validate the information about the user from a YAML file.
+
+    :param path: the path to the YAML file
+    :param snapshot_cache: the cache of snapshots of validated information, reused
+        until the file changes, so that it is neither parsed nor validated again
+    """
+    # NOTE: imported here so that loading achievements does not import pydantic
+    from apply_gpt.data import AboutMe
+
+    text = path.read_text()
+    if snapshot_cache is None:
+        return AboutMe.model_validate(load_yaml(text))
+
+    key = DiskCache.key("about_me", _snapshot_version(), text)
+    snapshot = snapshot_cache.get(key)
+    if snapshot is not None:
+        # NOTE: the cache directory is trusted, as it is written by this module only
+        about_me = pickle.loads(snapshot)
+        if isinstance(about_me, AboutMe):
+            return about_me
+
+    about_me = AboutMe.model_validate(load_yaml(text))
+    snapshot_cache.put(key, pickle.dumps(about_me, protocol=pickle.HIGHEST_PROTOCOL))
+    return about_me
+
+
+def load_achievements(path: Path) -> Sequence[str]:
+    """
+    Load the list of achievements from a YAML file.
+    """
+    achievements: Sequence[str] = load_yaml(path.read_text())
+    return achievements
+
+
+@functools.cache
+def _snapshot_version() -> str:
+    import pydantic
+
+    from apply_gpt import data
+
+    # NOTE: snapshots are invalidated when the models or pydantic change, since their
+    # pickles depend on both
+    return hashlib.sha256(
+        Path(data.__file__).read_bytes() + pydantic.VERSION.encode()
+    ).hexdigest()
@@ -0,0 +1,175 @@
+from collections import Counter
+from typing import NamedTuple, Protocol, Sequence
+
+import numpy as np
+
+from apply_gpt.data import AboutMe
+from apply_gpt.job_description import strip_boilerplate
+from apply_gpt.utils import extract_terms
+
+
+class ProfileJobMatcher(Protocol):
+    def score(
+        self, about_mes: Sequence[AboutMe], job_descriptions: Sequence[str]
+    ) -> np.ndarray:
+        """
+        Score how well each profile matches each job, the higher the better.
+
+        :param about_mes: the profiles
+        :param job_descriptions: the job descriptions
+        :return: the profiles x jobs matrix of scores
+        """
+        ...
+
+
+class TfidfProfileJobMatcher(ProfileJobMatcher):
+    """
+    Scores profiles by the cosine similarity of their terms with the terms of job
+    descriptions, weighted by tf-idf.
+
+    The terms of a profile are those of its roles, degrees and achievements. Terms
+    are weighted by their rarity among the job descriptions, so that terms found in
+    most postings, like "experience", barely count, and boilerplate is stripped from
+    job descriptions first. Vectors are sparse, and the whole matrix is computed in
+    one vectorized pass over the terms shared by profiles and job descriptions.
+    """
+
+    def __init__(self, strip_job_description_boilerplate: bool = True) -> None:
+        """
+        :param strip_job_description_boilerplate: whether to strip the parts of job
+            descriptions not describing the job before matching them
+        """
+        self._strip_job_description_boilerplate = strip_job_description_boilerplate
+
+    def score(
+        self, about_mes: Sequence[AboutMe], job_descriptions: Sequence[str]
+    ) -> np.ndarray:
+        term_to_index: dict[str, int] = {}
+        job_indices: list[int] = []
+        job_term_indices: list[int] = []
+        job_term_frequencies: list[int] = []
+        for job_index, job_description in enumerate(job_descriptions):
+            if self._strip_job_description_boilerplate:
+                job_description = strip_boilerplate(job_description)
+            term_to_frequency = Counter(extract_terms(job_description))
+            job_indices.extend([job_index] * len(term_to_frequency))
+            job_term_indices.extend(
+                term_to_index.setdefault(t, len(term_to_index))
+                for t in term_to_frequency
+            )
+            job_term_frequencies.extend(term_to_frequency.values())
+        # NOTE: only terms occurring in job descriptions can contribute to scores
+        profile_indices: list[int] = []
+        profile_term_indices: list[int] = []
+        for profile_index, about_me in enumerate(about_mes):
+            term_indices = {
+                term_to_index[t]
+                for t in extract_terms(_textify(about_me))
+                if t in term_to_index
+            }
+            profile_indices.extend([profile_index] * len(term_indices))
+            profile_term_indices.extend(term_indices)
+
+        term_count = len(term_to_index)
+        job_count = len(job_descriptions)
+        scores = np.zeros((len(about_mes), job_count), dtype=np.float64)
+        if term_count == 0 or len(profile_indices) == 0:
+            return scores
+
+        # Jobs x terms sparse matrix, with sublinear term frequencies
+        job_rows = np.array(job_indices, dtype=np.int64)
+        job_columns = np.array(job_term_indices, dtype=np.int64)
+        term_frequencies = np.array(job_term_frequencies, dtype=np.float64)
+        document_frequencies = np.bincount(job_columns, minlength=term_count)
+        term_weights = np.log((job_count + 1) / (document_frequencies + 1)) + 1.0
+        job_values = (1.0 + np.log(term_frequencies)) * term_weights[job_columns]
+        job_values /= _row_norms(job_rows, job_values, job_count)[job_rows]
+
+        # Profiles x terms sparse matrix, with binary term frequencies
+        profile_rows = np.array(profile_indices, dtype=np.int64)
+        profile_columns = np.array(profile_term_indices, dtype=np.int64)
+        profile_values = term_weights[profile_columns]
+        profile_values /= _row_norms(profile_rows, profile_values, len(about_mes))[
+            profile_rows
+        ]
+
+        # NOTE: the product is a join on terms, each profile term expanding into
+        # the jobs with that term, found in the jobs sorted by term
+        order = np.argsort(job_columns, kind="stable")
+        job_rows, job_columns, job_values = (
+            job_rows[order],
+            job_columns[order],
+            job_values[order],
+        )
+        term_starts = np.searchsorted(job_columns, np.arange(term_count + 1))
+        starts = term_starts[profile_columns]
+        lengths = term_starts[profile_columns + 1] - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        job_entries = np.repeat(starts, lengths) + offsets
+        scores += np.bincount(
+            np.repeat(profile_rows, lengths) * job_count + job_rows[job_entries],
+            weights=np.repeat(profile_values, lengths) * job_values[job_entries],
+            minlength=scores.size,
+        ).reshape(scores.shape)
+        return scores
+
+
+class Match(NamedTuple):
+    profile_index: int
+    job_index: int
+    score: float
+
+
+def select_matches(
+    scores: np.ndarray,
+    top_k_per_job: int | None = None,
+    top_k_per_profile: int | None = None,
+    threshold: float | None = None,
+) -> Sequence[Match]:
+    """
+    Select the pairs of a profiles x jobs matrix of scores worth generating
+    curriculums for, meeting all the given criteria, sorted by job then score.
+
+    :param top_k_per_job: the number of best profiles kept for each job
+    :param top_k_per_profile: the number of best jobs kept for each profile
+    :param threshold: the minimum score of the pairs kept
+    """
+    selected = np.ones(scores.shape, dtype=bool)
+    if threshold is not None:
+        selected &= scores >= threshold
+    for axis, top_k in ((0, top_k_per_job), (1, top_k_per_profile)):
+        if top_k is None or top_k >= scores.shape[axis]:
+            continue
+        top_indices = np.argpartition(-scores, top_k - 1, axis=axis)
+        top_indices = top_indices[:top_k] if axis == 0 else top_indices[:, :top_k]
+        top = np.zeros(scores.shape, dtype=bool)
+        np.put_along_axis(top, top_indices, True, axis=axis)
+        selected &= top
+
+    profile_indices, job_indices = np.nonzero(selected)
+    order = np.lexsort((-scores[profile_indices, job_indices], job_indices))
+    return [
+        Match(profile_index=int(p), job_index=int(j), score=float(scores[p, j]))
+        for p, j in zip(profile_indices[order], job_indices[order])
+    ]
+
+
+def _textify(about_me: AboutMe) -> str:
+    texts: list[str] = []
+    for employment in about_me.employments:
+        texts.append(employment.role)
+        texts.extend(employment.achievements or ())
+    for education in about_me.educations:
+        texts.append(education.degree)
+        texts.extend(education.achievements or ())
+    return "\n".join(texts)
+
+
+def _row_norms(rows: np.ndarray, values: np.ndarray, row_count: int) -> np.ndarray:
+    norms: np.ndarray = np.sqrt(
+        np.bincount(rows, weights=values**2, minlength=row_count)
+    )
+    norms[norms == 0.0] = 1.0
+    return norms
@@ -0,0 +1,108 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator, Sequence
+
+
+class Metrics:
+    """
+    Records measurements of model calls, grouped by function name.
+
+    Measurements are named after what they measure and the unit, e.g.
+    `latency_seconds` or `prompt_tokens`.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self) -> None:
+        self._samples: defaultdict[str, defaultdict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+
+    def record(self, function_name: str, metric: str, value: float) -> None:
+        self._samples[function_name][metric].append(value)
+
+    @contextmanager
+    def time(self, function_name: str, metric: str) -> Iterator[None]:
+        """
+        Record the wall-clock duration of the enclosed block in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(function_name, metric, time.perf_counter() - start)
+
+    def samples(self, function_name: str, metric: str) -> Sequence[float]:
+        metric_to_samples = self._samples.get(function_name)
+        if metric_to_samples is None:
+            return ()
+        return metric_to_samples.get(metric, ())
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Summarize the measurements of each metric of each function.
+        """
+        return {
+            function_name: {
+                metric: _summarize(samples)
+                for metric, samples in sorted(metric_to_samples.items())
+                if len(samples) > 0
+            }
+            for function_name, metric_to_samples in sorted(self._samples.items())
+            if any(len(samples) > 0 for samples in metric_to_samples.values())
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Export the measurements as summaries in Prometheus text exposition format.
+        """
+        metric_to_lines: defaultdict[str, list[str]] = defaultdict(list)
+        for function_name, metric_to_summary in self.summary().items():
+            for metric, summary in metric_to_summary.items():
+                name = f"apply_gpt_{metric}"
+                labels = f'function="{function_name}"'
+                lines = metric_to_lines[name]
+                for quantile in Metrics.QUANTILES:
+                    lines.append(
+                        f'{name}{{{labels},quantile="{quantile}"}} '
+                        f"{summary[f'p{round(quantile * 100)}']}"
+                    )
+                lines.append(f"{name}_sum{{{labels}}} {summary['sum']}")
+                lines.append(f"{name}_count{{{labels}}} {int(summary['count'])}")
+
+        text = ""
+        for name, lines in sorted(metric_to_lines.items()):
+            text += f"# TYPE {name} summary\n"
+            text += "".join(f"{line}\n" for line in lines)
+        return text
+
+
+def timed(
+    metrics: Metrics | None, function_name: str, metric: str
+) -> ContextManager[None]:
+    """
+    Time the enclosed block if metrics are being recorded.
+    """
+    if metrics is None:
+        return nullcontext()
+    return metrics.time(function_name, metric)
+
+
+def _summarize(samples: Sequence[float]) -> dict[str, float]:
+    sorted_samples = sorted(samples)
+    summary = {
+        "count": float(len(sorted_samples)),
+        "sum": sum(sorted_samples),
+        "mean": sum(sorted_samples) / len(sorted_samples),
+        "max": sorted_samples[-1],
+    }
+    for quantile in Metrics.QUANTILES:
+        # NOTE: nearest-rank quantile, exact for the small sample sizes at hand
+        index = min(int(quantile * len(sorted_samples)), len(sorted_samples) - 1)
+        summary[f"p{round(quantile * 100)}"] = sorted_samples[index]
+    return summary
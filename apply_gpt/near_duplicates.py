@@ -0,0 +1,119 @@
+import re
+import zlib
+from typing import Generic, Hashable, Mapping, TypeVar
+
+import numpy as np
+
+Key = TypeVar("Key", bound=Hashable)
+
+_WORD = re.compile(r"\w+")
+# NOTE: a Mersenne prime, so that products of 31-bit values fit in 64 bits
+_MINHASH_PRIME = (1 << 31) - 1
+
+
+class NearDuplicateIndex(Generic[Key]):
+    """
+    Finds the texts similar to texts added before, like postings reposted on
+    several boards with small edits.
+
+    Texts are fingerprinted with MinHash signatures of their word shingles, whose
+    agreement estimates the Jaccard similarity of the shingles. Locality-sensitive
+    hashing of bands of the signatures finds candidates without comparing a text
+    to every other one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        shingle_words: int = 5,
+        band_count: int = 16,
+        band_rows: int = 8,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param threshold: the minimum estimated similarity of near-duplicates
+        :param shingle_words: the number of words of each shingle
+        :param band_count: the number of bands of the signatures, the more the more
+            candidates with a similarity below the threshold are compared
+        :param band_rows: the number of hashes of each band, the more the fewer
+        :param seed: the seed of the hash functions
+        """
+        self._threshold = threshold
+        self._shingle_words = shingle_words
+        self._band_count = band_count
+        self._band_rows = band_rows
+        random = np.random.default_rng(seed)
+        hash_count = band_count * band_rows
+        self._a = random.integers(1, _MINHASH_PRIME, hash_count, dtype=np.uint64)
+        self._b = random.integers(0, _MINHASH_PRIME, hash_count, dtype=np.uint64)
+        self._key_to_signature: dict[Key, np.ndarray] = {}
+        self._bands: list[dict[bytes, list[Key]]] = [{} for _ in range(band_count)]
+
+    def add(self, key: Key, text: str) -> None:
+        signature = self.signature(text)
+        self._key_to_signature[key] = signature
+        for band, band_signature in zip(self._bands, self._split(signature)):
+            band.setdefault(band_signature, []).append(key)
+
+    def find(self, text: str) -> Key | None:
+        """
+        Return the key of the most similar text added, if a near-duplicate.
+        """
+        signature = self.signature(text)
+        candidate_keys: set[Key] = set()
+        for band, band_signature in zip(self._bands, self._split(signature)):
+            candidate_keys.update(band.get(band_signature, ()))
+
+        best_key: Key | None = None
+        best_similarity = self._threshold
+        for key in candidate_keys:
+            similarity = float(np.mean(self._key_to_signature[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text, insensitive to case and punctuation.
+        """
+        words = _WORD.findall(text.lower())
+        shingles = {
+            " ".join(words[i : i + self._shingle_words])
+            for i in range(max(len(words) - self._shingle_words + 1, 1))
+        }
+        # NOTE: CRC32 is stable across processes, unlike the salted built-in hash
+        shingle_hashes = np.fromiter(
+            (zlib.crc32(s.encode()) % _MINHASH_PRIME for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        hashes = (
+            self._a[:, np.newaxis] * shingle_hashes[np.newaxis, :]
+            + self._b[:, np.newaxis]
+        ) % _MINHASH_PRIME
+        signature: np.ndarray = hashes.min(axis=1)
+        return signature
+
+    def _split(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[i * self._band_rows : (i + 1) * self._band_rows].tobytes()
+            for i in range(self._band_count)
+        ]
+
+
+def find_near_duplicates(
+    key_to_text: Mapping[Key, str], threshold: float = 0.8
+) -> dict[Key, Key]:
+    """
+    Map the key of each text that is a near-duplicate of a previous one, in the
+    order of the mapping, to the key of the most similar previous one.
+    """
+    near_duplicate_index: NearDuplicateIndex[Key] = NearDuplicateIndex(threshold)
+    key_to_original_key: dict[Key, Key] = {}
+    for key, text in key_to_text.items():
+        original_key = near_duplicate_index.find(text)
+        if original_key is None:
+            near_duplicate_index.add(key, text)
+        else:
+            key_to_original_key[key] = original_key
+    return key_to_original_key
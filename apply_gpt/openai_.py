@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
+import shutil
+import subprocess
 import sys
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from pathlib import Path
 from typing import (
     Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
     Literal,
     Mapping,
     NotRequired,
+    Protocol,
     Sequence,
     TypeAlias,
     TypedDict,
 )
 
-import openai
-
+from apply_gpt.cache import DiskCache
+from apply_gpt.json_repair import repair_json
+from apply_gpt.json_stream import JsonItemStream
+from apply_gpt.metrics import Metrics, timed
 from apply_gpt.utils import Json
 
 
@@ -59,15 +73,61 @@ class OpenaiTyping:
             name: str
 
 
-class OpenaiModule:
+class ChatCompletionModule(Protocol):
+    @property
+    def model(self) -> str:
+        ...
+
+    def chat_completion_create(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        ...
+
+    async def chat_completion_acreate(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        ...
+
+    def chat_completion_astream(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> AsyncGenerator[Any, None]:
+        ...
+
+
+class OpenaiModule(ChatCompletionModule):
     """
     Low level wrapper of direct calls to OpenAI's python module.
     """
 
     def __init__(self, api_key: str, model: str) -> None:
-        openai.api_key = api_key
+        self._api_key = api_key
         self._model = model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @functools.cached_property
+    def _chat_completion(self) -> Any:
+        # NOTE: imported on the first call as importing it is slow, and not needed by
+        # other classes nor to render requests, e.g. for Batch API files
+        import openai
+
+        openai.api_key = self._api_key
+        return openai.ChatCompletion
+
     def chat_completion_create(
         self,
         messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
@@ -75,7 +135,7 @@ class OpenaiModule:
         function_call: OpenaiTyping.Function.Call,
         temperature: float,
     ) -> Any:
-        return openai.ChatCompletion.create(
+        return self._chat_completion.create(
             model=self._model,
             messages=messages,
             functions=functions,
@@ -83,15 +143,114 @@ class OpenaiModule:
             temperature=temperature,
         )
 
+    async def chat_completion_acreate(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        return await self._chat_completion.acreate(
+            model=self._model,
+            messages=messages,
+            functions=functions,
+            function_call=function_call,
+            temperature=temperature,
+        )
+
+    async def chat_completion_astream(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> AsyncGenerator[Any, None]:
+        chunks = await self._chat_completion.acreate(
+            model=self._model,
+            messages=messages,
+            functions=functions,
+            function_call=function_call,
+            temperature=temperature,
+            stream=True,
+        )
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+
+
+@asynccontextmanager
+async def keep_alive_session(max_connections: int) -> AsyncIterator[None]:
+    """
+    Reuse pooled keep-alive connections for the asynchronous calls within.
+
+    By default, OpenAI's python module opens a new connection for each asynchronous
+    call, paying for the TCP and TLS handshakes every time.
+
+    :param max_connections: the maximum number of connections kept open at once
+    """
+    import aiohttp
+    import openai
+
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = openai.aiosession.set(session)
+        try:
+            yield
+        finally:
+            openai.aiosession.reset(token)
+
+
+class JsonGenerator(Protocol):
+    @property
+    def model(self) -> str:
+        ...
+
+    def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        ...
+
+    async def agenerate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        ...
+
+    def astream_items(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> AsyncGenerator[tuple[str, Json], None]:
+        ...
+
 
 # Ref: https://blog.simonfarshid.com/native-json-output-from-gpt-4
-class OpenaiJsonGenerator:
+class OpenaiJsonGenerator(JsonGenerator):
     """
     Generates a JSON object with an OpenAI API call.
     """
 
-    def __init__(self, openai_module: OpenaiModule) -> None:
+    def __init__(
+        self, openai_module: ChatCompletionModule, metrics: Metrics | None = None
+    ) -> None:
+        """
+        :param metrics: the metrics recording latency, size and parsing time of calls
+        """
         self._openai_module = openai_module
+        self._metrics = metrics
+
+    @property
+    def model(self) -> str:
+        return self._openai_module.model
 
     def generate(
         self,
@@ -109,39 +268,587 @@ class OpenaiJsonGenerator:
         :param schema: the JSON schema of the generated object
         """
         function_name = f"generate_{name}"
-        completion = self._openai_module.chat_completion_create(
-            messages=(
+        with timed(self._metrics, function_name, "latency_seconds"):
+            completion = self._openai_module.chat_completion_create(
+                **OpenaiJsonGenerator.create_request(
+                    system_message, user_message, name, schema
+                )
+            )
+        self._record_sizes(function_name, system_message, user_message, completion)
+        return self._parse_completion(function_name, completion)
+
+    async def agenerate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: Schema,
+    ) -> Json:
+        """
+        Asynchronous version of `generate`, see there for the parameters.
+        """
+        function_name = f"generate_{name}"
+        with timed(self._metrics, function_name, "latency_seconds"):
+            completion = await self._openai_module.chat_completion_acreate(
+                **OpenaiJsonGenerator.create_request(
+                    system_message, user_message, name, schema
+                )
+            )
+        self._record_sizes(function_name, system_message, user_message, completion)
+        return self._parse_completion(function_name, completion)
+
+    async def astream_items(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: Schema,
+    ) -> AsyncGenerator[tuple[str, Json], None]:
+        """
+        Stream the items of the arrays of a JSON object as soon as they are generated.
+
+        The generation is aborted as soon as the generated JSON is malformed, or as
+        soon as the caller stops iterating, e.g. because an item is invalid. See
+        `generate` for the parameters, the schema must be an object of arrays.
+        """
+        function_name = f"generate_{name}"
+        start = time.perf_counter()
+        json_item_stream = JsonItemStream()
+        is_first_item = True
+        chunks = self._openai_module.chat_completion_astream(
+            **OpenaiJsonGenerator.create_request(
+                system_message, user_message, name, schema
+            )
+        )
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                function_call_delta = chunk.choices[0].delta.get("function_call")
+                if function_call_delta is None:
+                    continue
+                arguments_delta = function_call_delta.get("arguments", "")
+                for item in json_item_stream.feed(arguments_delta):
+                    if is_first_item and self._metrics is not None:
+                        self._metrics.record(
+                            function_name,
+                            "first_item_seconds",
+                            time.perf_counter() - start,
+                        )
+                    is_first_item = False
+                    yield item
+        json_item_stream.close()
+
+        if self._metrics is not None:
+            self._metrics.record(
+                function_name, "latency_seconds", time.perf_counter() - start
+            )
+            self._metrics.record(
+                function_name, "prompt_chars", len(system_message) + len(user_message)
+            )
+
+    @staticmethod
+    def create_request(
+        system_message: str, user_message: str, name: str, schema: Schema
+    ) -> dict[str, Any]:
+        """
+        Create the arguments of the OpenAI API call generating a JSON object, which
+        are also the body of the request, apart from the model.
+
+        See `generate` for the parameters.
+        """
+        function_name = f"generate_{name}"
+        return {
+            "messages": (
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message},
             ),
-            functions=[{"name": function_name, "parameters": schema}],
-            function_call={"name": function_name},
-            temperature=0.0,
-        )
+            "functions": [{"name": function_name, "parameters": schema}],
+            "function_call": {"name": function_name},
+            "temperature": 0.0,
+        }
+
+    def _parse_completion(self, function_name: str, completion: Any) -> Json:
         generated_json_str: str = completion.choices[0].message.function_call.arguments
-        generated_json: Json = json.loads(generated_json_str)
+        with timed(self._metrics, function_name, "parse_seconds"):
+            try:
+                generated_json: Json = json.loads(generated_json_str)
+            except json.JSONDecodeError:
+                # NOTE: repaired locally, as generating again costs a whole call
+                generated_json = repair_json(generated_json_str)
+                if self._metrics is not None:
+                    self._metrics.record(function_name, "repaired_json", 1)
         return generated_json
 
+    def _record_sizes(
+        self,
+        function_name: str,
+        system_message: str,
+        user_message: str,
+        completion: Any,
+    ) -> None:
+        if self._metrics is None:
+            return
+        self._metrics.record(
+            function_name, "prompt_chars", len(system_message) + len(user_message)
+        )
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self._metrics.record(function_name, "prompt_tokens", usage.prompt_tokens)
+            self._metrics.record(
+                function_name, "completion_tokens", usage.completion_tokens
+            )
+
     Schema: TypeAlias = OpenaiTyping.Function.Parameters.Any
 
 
+class CachedJsonGenerator(JsonGenerator):
+    """
+    Serves generations from a disk cache, delegating to a JSON generator on misses.
+
+    Generations are deterministic (temperature is zero), hence they are addressed by
+    the full content of the request.
+    """
+
+    def __init__(
+        self, json_generator: JsonGenerator, cache: DiskCache, refresh: bool = False
+    ) -> None:
+        """
+        :param json_generator: the generator to delegate cache misses to
+        :param cache: the cache storing the generated objects
+        :param refresh: whether to ignore cached objects and overwrite them
+        """
+        self._json_generator = json_generator
+        self._cache = cache
+        self._refresh = refresh
+
+    @property
+    def model(self) -> str:
+        return self._json_generator.model
+
+    def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        key = self._key(system_message, user_message, name, schema)
+        cached_json = self._get(key)
+        if cached_json is not None:
+            return cached_json
+
+        generated_json = self._json_generator.generate(
+            system_message=system_message,
+            user_message=user_message,
+            name=name,
+            schema=schema,
+        )
+        self._cache.put(key, json.dumps(generated_json).encode())
+        return generated_json
+
+    async def agenerate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        key = self._key(system_message, user_message, name, schema)
+        cached_json = self._get(key)
+        if cached_json is not None:
+            return cached_json
+
+        generated_json = await self._json_generator.agenerate(
+            system_message=system_message,
+            user_message=user_message,
+            name=name,
+            schema=schema,
+        )
+        self._cache.put(key, json.dumps(generated_json).encode())
+        return generated_json
+
+    async def astream_items(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> AsyncGenerator[tuple[str, Json], None]:
+        key = self._key(system_message, user_message, name, schema)
+        cached_json = self._get(key)
+        if isinstance(cached_json, dict):
+            for array_key, array in cached_json.items():
+                for item in array if isinstance(array, list) else ():
+                    yield array_key, item
+            return
+
+        # NOTE: arrays are initialized from the schema, as empty ones yield no items
+        generated_json: dict[str, list[Json]] = {}
+        if schema["type"] == "object":
+            generated_json = {
+                property_name: []
+                for property_name, property_schema in schema["properties"].items()
+                if property_schema.get("type") == "array"
+            }
+        items = self._json_generator.astream_items(
+            system_message=system_message,
+            user_message=user_message,
+            name=name,
+            schema=schema,
+        )
+        async with aclosing(items):
+            async for array_key, item in items:
+                generated_json.setdefault(array_key, []).append(item)
+                yield array_key, item
+        self._cache.put(key, json.dumps(generated_json).encode())
+
+    def _key(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> str:
+        return DiskCache.key(
+            self.model,
+            system_message,
+            user_message,
+            name,
+            json.dumps(schema, sort_keys=True),
+        )
+
+    def _get(self, key: str) -> Json:
+        if self._refresh:
+            return None
+        cached_json_bytes = self._cache.get(key)
+        if cached_json_bytes is None:
+            return None
+        cached_json: Json = json.loads(cached_json_bytes)
+        return cached_json
+
+
+class HedgedJsonGenerator(JsonGenerator):
+    """
+    Hedges asynchronous generations slower than most with a duplicate request,
+    possibly to a faster model, keeping the first valid generation and cancelling
+    the other request.
+
+    The deadline of the duplicate is a quantile of the recent latencies of the
+    requests of the same type of object, so that only the tail is duplicated.
+    Synchronous generations are not hedged, as their requests cannot be cancelled,
+    and neither are streamed ones. Caches belong under the hedging, one for each
+    generator, as the generation returned may come from either model.
+    """
+
+    def __init__(
+        self,
+        json_generator: JsonGenerator,
+        hedge_json_generator: JsonGenerator | None = None,
+        deadline_quantile: float = 0.9,
+        initial_deadline: float | None = None,
+        min_latency_samples: int = 20,
+        max_latency_samples: int = 1000,
+        validate: Callable[[str, Json], object] | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """
+        :param json_generator: the generator of the first requests
+        :param hedge_json_generator: the generator of the duplicate requests, e.g.
+            of a faster model (the generator of the first requests if unset)
+        :param deadline_quantile: the quantile of the latencies of first requests
+            after which a duplicate request is sent
+        :param initial_deadline: the deadline in seconds while too few latencies
+            are known (no duplicate requests until then if unset)
+        :param min_latency_samples: the number of latencies needed for a quantile
+        :param max_latency_samples: the number of recent latencies kept
+        :param validate: the function validating a generated object given its name,
+            raising `ValueError` if invalid, as an invalid generation loses to a
+            valid one (all generations are valid if unset)
+        :param metrics: the metrics recording how often duplicates were sent and won
+        """
+        self._json_generator = json_generator
+        self._hedge_json_generator = (
+            hedge_json_generator if hedge_json_generator is not None else json_generator
+        )
+        self._deadline_quantile = deadline_quantile
+        self._initial_deadline = initial_deadline
+        self._min_latency_samples = min_latency_samples
+        self._max_latency_samples = max_latency_samples
+        self._validate = validate
+        self._metrics = metrics
+        self._name_to_latencies: dict[str, deque[float]] = {}
+        self._generation_count = 0
+        self._hedged_count = 0
+        self._hedge_won_count = 0
+
+    @property
+    def model(self) -> str:
+        return self._json_generator.model
+
+    @property
+    def generation_count(self) -> int:
+        return self._generation_count
+
+    @property
+    def hedged_count(self) -> int:
+        return self._hedged_count
+
+    @property
+    def hedge_won_count(self) -> int:
+        return self._hedge_won_count
+
+    def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        return self._json_generator.generate(
+            system_message=system_message,
+            user_message=user_message,
+            name=name,
+            schema=schema,
+        )
+
+    async def agenerate(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> Json:
+        def create_task(json_generator: JsonGenerator) -> asyncio.Task[Json]:
+            return asyncio.create_task(
+                json_generator.agenerate(
+                    system_message=system_message,
+                    user_message=user_message,
+                    name=name,
+                    schema=schema,
+                )
+            )
+
+        function_name = f"generate_{name}"
+        start = time.perf_counter()
+        deadline = self._deadline(name)
+        tasks = [create_task(self._json_generator)]
+        # NOTE: a generation done without waiting was served locally, e.g. by a cache
+        # under the hedging, so it is neither hedged nor a latency of the model
+        await asyncio.sleep(0)
+        if tasks[0].done():
+            return tasks[0].result()
+        pending: set[asyncio.Task[Json]] = set(tasks)
+        # NOTE: an invalid or failed generation is only returned or raised when the
+        # other one is not better, the first request's taking precedence
+        invalid_task: asyncio.Task[Json] | None = None
+        try:
+            while len(pending) > 0:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=deadline if len(tasks) == 1 else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if len(done) == 0:
+                    tasks.append(create_task(self._hedge_json_generator))
+                    pending.add(tasks[-1])
+                    continue
+
+                for task in (t for t in tasks if t in done):
+                    if task is tasks[0]:
+                        self._record_latency(name, time.perf_counter() - start)
+                    if task.exception() is None and self._is_valid(name, task.result()):
+                        self._record_outcome(function_name, tasks, task)
+                        return task.result()
+                    if invalid_task is None or (
+                        invalid_task.exception() is not None
+                        and task.exception() is None
+                    ):
+                        invalid_task = task
+        finally:
+            for task in pending:
+                task.cancel()
+            if tasks[0] in pending:
+                # NOTE: a lower bound of the latency of the first request, as it lost
+                self._record_latency(name, time.perf_counter() - start)
+
+        assert invalid_task is not None
+        self._record_outcome(function_name, tasks, invalid_task)
+        return invalid_task.result()
+
+    async def astream_items(
+        self,
+        system_message: str,
+        user_message: str,
+        name: str,
+        schema: OpenaiJsonGenerator.Schema,
+    ) -> AsyncGenerator[tuple[str, Json], None]:
+        items = self._json_generator.astream_items(
+            system_message=system_message,
+            user_message=user_message,
+            name=name,
+            schema=schema,
+        )
+        async with aclosing(items):
+            async for item in items:
+                yield item
+
+    def _deadline(self, name: str) -> float | None:
+        latencies = self._name_to_latencies.get(name, ())
+        if len(latencies) < self._min_latency_samples:
+            return self._initial_deadline
+        sorted_latencies = sorted(latencies)
+        index = min(
+            int(self._deadline_quantile * len(sorted_latencies)),
+            len(sorted_latencies) - 1,
+        )
+        return sorted_latencies[index]
+
+    def _record_latency(self, name: str, latency: float) -> None:
+        latencies = self._name_to_latencies.setdefault(
+            name, deque(maxlen=self._max_latency_samples)
+        )
+        latencies.append(latency)
+
+    def _is_valid(self, name: str, generated_json: Json) -> bool:
+        if self._validate is None:
+            return True
+        try:
+            self._validate(name, generated_json)
+        except ValueError:
+            return False
+        return True
+
+    def _record_outcome(
+        self,
+        function_name: str,
+        tasks: list[asyncio.Task[Json]],
+        winner_task: asyncio.Task[Json],
+    ) -> None:
+        hedged = len(tasks) > 1
+        hedge_won = winner_task is not tasks[0]
+        self._generation_count += 1
+        self._hedged_count += hedged
+        self._hedge_won_count += hedge_won
+        if self._metrics is not None:
+            self._metrics.record(function_name, "hedged", float(hedged))
+            if hedged:
+                self._metrics.record(function_name, "hedge_won", float(hedge_won))
+
+
 class OpenaiManualJsonGenerator:
-    def generate(self, message: str) -> Json:
+    """
+    Generates a JSON object by manually interacting with ChatGPT, the user sending
+    the message and pasting the response.
+    """
+
+    def __init__(
+        self, response_path: Path | None = None, clipboard: bool = False
+    ) -> None:
+        """
+        :param response_path: the path to the file to read responses from, saved
+            there by the user instead of pasted in the terminal
+        :param clipboard: whether to copy messages to the clipboard, and to read the
+            responses copied there instead of pasted in the terminal
+        """
+        self._response_path = response_path
+        self._clipboard = _Clipboard() if clipboard else None
+
+    def generate(
+        self, message: str, validate: Callable[[Json], object] | None = None
+    ) -> Json:
         """
         Generate a JSON object by manually interacting with ChatGPT.
 
+        Responses that cannot be parsed or are invalid are asked for again, e.g.
+        after fixing them or regenerating them, without sending the message again.
+
         :param message: the message request the generation of the object
+        :param validate: the function validating the object, raising `ValueError`
+            if invalid
         """
+        if self._clipboard is not None:
+            self._clipboard.copy(message)
+            print("The message was copied to the clipboard, send it to ChatGPT")
+        else:
+            print(
+                "Copy the message below and send it to ChatGPT\n"
+                ">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>\n\n"
+                f"{message}\n\n"
+                "<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<\n"
+                "Copy the message above and send it to ChatGPT"
+            )
+
+        while True:
+            try:
+                # NOTE: repaired, as pasted responses often keep markdown fences
+                generated_json = repair_json(self._read_response())
+                if validate is not None:
+                    validate(generated_json)
+                return generated_json
+            except ValueError as e:
+                print(f"Invalid response: {e}")
+
+    def _read_response(self) -> str:
+        if self._response_path is not None:
+            print(
+                f"Then save the obtained JSON to `{self._response_path}`\n"
+                "Enter return when done\n"
+            )
+            _wait_for_return()
+            return self._response_path.read_text()
+        if self._clipboard is not None:
+            print("Then copy the obtained JSON\nEnter return when done\n")
+            _wait_for_return()
+            return self._clipboard.paste()
 
         print(
-            "Copy the message below and send it to ChatGPT\n"
-            ">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>\n\n"
-            f"{message}\n\n"
-            "<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<\n"
-            "Copy the message above and send it to ChatGPT\n"
             "Then copy the obtained JSON and paste it below\n"
             "Enter ctrl-D on a new line when done\n"
         )
-        generated_json_str: str = sys.stdin.read()
-        generated_json: Json = json.loads(generated_json_str)
-        return generated_json
+        response = sys.stdin.read()
+        if len(response.strip()) == 0:
+            raise EOFError("No response pasted")
+        return response
+
+
+def _wait_for_return() -> None:
+    # NOTE: asking again for a response at the end of the input would never end
+    if sys.stdin.readline() == "":
+        raise EOFError("No more input")
+
+
+class _Clipboard:
+    """
+    The system clipboard, accessed through the first available command line tool.
+    """
+
+    def __init__(self) -> None:
+        commands = next(
+            (c for c in _Clipboard._COMMANDS if shutil.which(c[0][0]) is not None),
+            None,
+        )
+        if commands is None:
+            raise RuntimeError(
+                "No clipboard tool found, install one of "
+                f"{', '.join(c[0][0] for c in _Clipboard._COMMANDS)}"
+            )
+        self._copy_command, self._paste_command = commands
+
+    def copy(self, text: str) -> None:
+        subprocess.run(self._copy_command, input=text.encode(), check=True)
+
+    def paste(self) -> str:
+        return subprocess.run(
+            self._paste_command, capture_output=True, check=True
+        ).stdout.decode()
+
+    # NOTE: macOS, Wayland, X11 and Windows tools, with their copy and paste commands
+    _COMMANDS: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...] = (
+        (("pbcopy",), ("pbpaste",)),
+        (("wl-copy",), ("wl-paste", "--no-newline")),
+        (
+            ("xclip", "-selection", "clipboard"),
+            ("xclip", "-selection", "clipboard", "-o"),
+        ),
+        (("xsel", "--clipboard", "--input"), ("xsel", "--clipboard", "--output")),
+        (("clip.exe",), ("powershell.exe", "-command", "Get-Clipboard")),
+    )
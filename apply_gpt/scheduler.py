@@ -0,0 +1,322 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from contextlib import aclosing
+from enum import IntEnum
+from typing import Any, AsyncGenerator, Sequence
+
+from apply_gpt.openai_ import ChatCompletionModule, OpenaiTyping
+from apply_gpt.utils import estimate_tokens
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class RequestScheduler:
+    """
+    Admits requests within requests per minute and tokens per minute budgets.
+
+    Each budget is a token bucket holding up to one minute worth of capacity. When
+    requests are waiting, those with a higher priority are admitted first.
+
+    Priorities only order asynchronous requests, synchronous ones being admitted as
+    soon as the budgets allow, so that a scheduler admits either synchronous or
+    asynchronous requests, never both.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> None:
+        self._requests_bucket = _TokenBucket(requests_per_minute)
+        self._tokens_bucket = _TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[Priority, int]] = []
+        self._waiter_counter = itertools.count()
+        self._condition: asyncio.Condition | None = None
+        self._condition_loop: asyncio.AbstractEventLoop | None = None
+        self._asynchronous: bool | None = None
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Block until a request of the given size is admitted, regardless of the
+        priorities of other requests.
+        """
+        self._check_asynchronous(False)
+        while True:
+            with self._lock:
+                delay = self._admission_delay(tokens)
+                if delay <= 0.0:
+                    self._admit(tokens)
+                    return
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int, priority: Priority) -> None:
+        """
+        Wait until a request of the given size and priority is admitted.
+        """
+        self._check_asynchronous(True)
+        condition = self._get_condition()
+        waiter = (priority, next(self._waiter_counter))
+        heapq.heappush(self._waiters, waiter)
+        async with condition:
+            try:
+                while True:
+                    if self._waiters[0] != waiter:
+                        await condition.wait()
+                        continue
+                    with self._lock:
+                        delay = self._admission_delay(tokens)
+                        if delay <= 0.0:
+                            heapq.heappop(self._waiters)
+                            self._admit(tokens)
+                            condition.notify_all()
+                            return
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    condition.notify_all()
+                raise
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Account for the difference between estimated and actual tokens of a request.
+        """
+        with self._lock:
+            self._tokens_bucket.consume(actual_tokens - estimated_tokens)
+
+    def _check_asynchronous(self, asynchronous: bool) -> None:
+        # NOTE: synchronous requests would overtake waiting asynchronous ones, as
+        # they do not queue by priority, and wait for the budgets in their threads
+        with self._lock:
+            if self._asynchronous is None:
+                self._asynchronous = asynchronous
+        if self._asynchronous != asynchronous:
+            raise RuntimeError(
+                "Scheduler admitting "
+                f"{'asynchronous' if self._asynchronous else 'synchronous'} requests "
+                f"cannot admit {'asynchronous' if asynchronous else 'synchronous'} ones"
+            )
+
+    def _admission_delay(self, tokens: int) -> float:
+        return max(
+            self._requests_bucket.delay(1),
+            self._tokens_bucket.delay(tokens),
+        )
+
+    def _admit(self, tokens: int) -> None:
+        self._requests_bucket.consume(1)
+        self._tokens_bucket.consume(tokens)
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+
+class ScheduledChatCompletionModule(ChatCompletionModule):
+    """
+    Sends requests through a scheduler, retrying transient errors with backoff.
+
+    Retried errors are rate limits, server errors, timeouts and connection errors.
+    The delay before each retry is drawn uniformly up to an exponentially growing
+    bound, so that concurrent requests failing together do not retry together.
+    Requests are either all synchronous or all asynchronous, like the scheduler's.
+    """
+
+    def __init__(
+        self,
+        openai_module: ChatCompletionModule,
+        request_scheduler: RequestScheduler,
+        priority: Priority = Priority.INTERACTIVE,
+        max_retries: int = 6,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self._openai_module = openai_module
+        self._request_scheduler = request_scheduler
+        self._priority = priority
+        self._max_retries = max_retries
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+
+    @property
+    def model(self) -> str:
+        return self._openai_module.model
+
+    def chat_completion_create(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        estimated_tokens = _estimate_prompt_tokens(messages, functions)
+        for attempt in itertools.count():
+            self._request_scheduler.acquire(estimated_tokens)
+            try:
+                completion = self._openai_module.chat_completion_create(
+                    messages=messages,
+                    functions=functions,
+                    function_call=function_call,
+                    temperature=temperature,
+                )
+            except Exception as e:
+                if attempt >= self._max_retries or not _is_retryable(e):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            self._settle(estimated_tokens, completion)
+            return completion
+
+    async def chat_completion_acreate(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> Any:
+        estimated_tokens = _estimate_prompt_tokens(messages, functions)
+        for attempt in itertools.count():
+            await self._request_scheduler.aacquire(estimated_tokens, self._priority)
+            try:
+                completion = await self._openai_module.chat_completion_acreate(
+                    messages=messages,
+                    functions=functions,
+                    function_call=function_call,
+                    temperature=temperature,
+                )
+            except Exception as e:
+                if attempt >= self._max_retries or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            self._settle(estimated_tokens, completion)
+            return completion
+
+    async def chat_completion_astream(
+        self,
+        messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+        functions: Sequence[OpenaiTyping.Function.Signature],
+        function_call: OpenaiTyping.Function.Call,
+        temperature: float,
+    ) -> AsyncGenerator[Any, None]:
+        # NOTE: only errors before the first chunk are retried, later ones would
+        # require the caller to discard the chunks already received
+        estimated_tokens = _estimate_prompt_tokens(messages, functions)
+        for attempt in itertools.count():
+            await self._request_scheduler.aacquire(estimated_tokens, self._priority)
+            chunks = self._openai_module.chat_completion_astream(
+                messages=messages,
+                functions=functions,
+                function_call=function_call,
+                temperature=temperature,
+            )
+            async with aclosing(chunks):
+                try:
+                    first_chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    if attempt >= self._max_retries or not _is_retryable(e):
+                        raise
+                    await asyncio.sleep(self._backoff(attempt, e))
+                    continue
+                yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        backoff = random.uniform(
+            0.0, min(self._max_backoff, self._initial_backoff * 2**attempt)
+        )
+        retry_after = (getattr(error, "headers", None) or {}).get("retry-after")
+        if retry_after is not None:
+            try:
+                backoff = max(backoff, float(retry_after))
+            except ValueError:
+                pass
+        return backoff
+
+    def _settle(self, estimated_tokens: int, completion: Any) -> None:
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self._request_scheduler.settle(estimated_tokens, usage.total_tokens)
+
+
+class _TokenBucket:
+    def __init__(self, capacity_per_minute: float | None) -> None:
+        self._capacity = capacity_per_minute
+        self._level = capacity_per_minute or 0.0
+        self._last_refill_time = time.monotonic()
+
+    def delay(self, amount: float) -> float:
+        """
+        Compute how long to wait before the given amount is available.
+        """
+        if self._capacity is None:
+            return 0.0
+        self._refill()
+        # NOTE: requests larger than the capacity would never be admitted otherwise
+        missing_amount = min(amount, self._capacity) - self._level
+        return max(missing_amount, 0.0) * 60.0 / self._capacity
+
+    def consume(self, amount: float) -> None:
+        if self._capacity is None:
+            return
+        self._refill()
+        # NOTE: level can go negative, delaying requests until the debt is repaid
+        self._level -= amount
+
+    def _refill(self) -> None:
+        assert self._capacity is not None
+        now = time.monotonic()
+        refilled_amount = (now - self._last_refill_time) * self._capacity / 60.0
+        self._level = min(self._level + refilled_amount, self._capacity)
+        self._last_refill_time = now
+
+
+def _estimate_prompt_tokens(
+    messages: tuple[OpenaiTyping.Message.System, OpenaiTyping.Message.User],
+    functions: Sequence[OpenaiTyping.Function.Signature],
+) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages) + estimate_tokens(
+        json.dumps(functions)
+    )
+
+
+def _is_retryable(error: Exception) -> bool:
+    # NOTE: imported here as importing it is slow, and not needed until a call fails
+    import openai
+
+    if not isinstance(error, openai.error.OpenAIError):
+        return False
+    if isinstance(
+        error,
+        (
+            openai.error.RateLimitError,
+            openai.error.ServiceUnavailableError,
+            openai.error.Timeout,
+            openai.error.TryAgain,
+            openai.error.APIConnectionError,
+        ),
+    ):
+        return True
+    return error.http_status is not None and (
+        error.http_status == 429 or error.http_status >= 500
+    )
@@ -0,0 +1,246 @@
+import functools
+import json
+from typing import Any, Iterable, cast
+
+from pydantic import BaseModel
+
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.utils import estimate_tokens
+
+_DEFS_KEY = "$defs"
+_REF_KEY = "$ref"
+_REF_PREFIX = f"#/{_DEFS_KEY}/"
+
+# NOTE: only annotations, the model reads the field names and types, while titles
+# merely repeat the field and model names
+_STRIPPED_KEYS = frozenset(("title",))
+_COMPACT_STRIPPED_KEYS = _STRIPPED_KEYS | {"description", "default"}
+
+
+@functools.cache
+def model_schema(
+    model: type[BaseModel], compact: bool = False
+) -> OpenaiJsonGenerator.Schema:
+    """
+    Create the JSON schema of the function parameters generating a model.
+
+    The schema is created once per process, and should not be modified. Optional
+    fields are not nullable, they are meant to be omitted, as in the models dumped
+    with `exclude_none`. Alternative models sharing their common fields, like a date
+    with or without a month, are merged into one model with the other fields
+    optional. Titles are stripped.
+
+    :param model: the model to generate
+    :param compact: whether to minimize the tokens of the schema, by referencing
+        the sub-schemas used more than once instead of repeating them, and by
+        stripping descriptions and defaults
+    """
+    pydantic_schema = model.model_json_schema()
+    name_to_def: dict[str, Any] = pydantic_schema.pop(_DEFS_KEY, {})
+    pydantic_schema = _merge_variants(pydantic_schema, name_to_def)
+    for name, def_schema in list(name_to_def.items()):
+        name_to_def[name] = _merge_variants(def_schema, name_to_def)
+    # NOTE: the merged alternatives are left unreferenced, along with their references
+    name_to_def = {
+        n: name_to_def[n] for n in _reachable_names(pydantic_schema, name_to_def)
+    }
+
+    referenced_names: set[str] = set()
+    if compact:
+        name_to_ref_count = _count_refs(pydantic_schema)
+        for def_schema in name_to_def.values():
+            for name, ref_count in _count_refs(def_schema).items():
+                name_to_ref_count[name] = name_to_ref_count.get(name, 0) + ref_count
+        # NOTE: a sub-schema used once is inlined, so it is used once in the result
+        referenced_names = {n for n, c in name_to_ref_count.items() if c > 1}
+
+    def transform(schema: Any) -> Any:
+        return _transform(schema, name_to_def, referenced_names, compact)
+
+    schema = transform(pydantic_schema)
+    if len(referenced_names) > 0:
+        schema[_DEFS_KEY] = {
+            n: transform(name_to_def[n]) for n in sorted(referenced_names)
+        }
+
+    # NOTE: the schema goes beyond the subset of JSON schema typed by OpenaiTyping
+    return cast(OpenaiJsonGenerator.Schema, schema)
+
+
+def property_schema(
+    schema: OpenaiJsonGenerator.Schema, property_name: str
+) -> OpenaiJsonGenerator.Schema:
+    """
+    Create the schema of an object with a single property of an object schema, e.g.
+    to generate a part of the object alone. The sub-schemas referenced by the other
+    properties only are dropped.
+
+    :param schema: the object schema, e.g. created by `model_schema`
+    :param property_name: the name of the property to keep
+    """
+    object_schema = cast(dict[str, Any], schema)
+    properties = {property_name: object_schema["properties"][property_name]}
+    sub_schema = {
+        k: v
+        for k, v in object_schema.items()
+        if k not in ("properties", "required", _DEFS_KEY)
+    }
+    sub_schema["properties"] = properties
+    if property_name in object_schema.get("required", ()):
+        sub_schema["required"] = [property_name]
+
+    name_to_def: dict[str, Any] = object_schema.get(_DEFS_KEY, {})
+    referenced_names = _reachable_names(properties, name_to_def)
+    if len(referenced_names) > 0:
+        sub_schema[_DEFS_KEY] = {n: name_to_def[n] for n in sorted(referenced_names)}
+
+    return cast(OpenaiJsonGenerator.Schema, sub_schema)
+
+
+def schema_tokens(schema: OpenaiJsonGenerator.Schema) -> int:
+    """
+    Estimate the number of prompt tokens a schema takes in each request.
+    """
+    return estimate_tokens(json.dumps(schema))
+
+
+def compact_schema_savings(model: type[BaseModel]) -> int:
+    """
+    Estimate the number of prompt tokens saved in each request by a compact schema.
+    """
+    return schema_tokens(model_schema(model)) - schema_tokens(
+        model_schema(model, compact=True)
+    )
+
+
+def _reachable_names(schema: Any, name_to_def: dict[str, Any]) -> set[str]:
+    """
+    Find the names of the definitions referenced by a schema, directly or not.
+    """
+    reachable_names: set[str] = set()
+    pending_names = set(_count_refs(schema))
+    while len(pending_names) > 0:
+        name = pending_names.pop()
+        reachable_names.add(name)
+        pending_names.update(set(_count_refs(name_to_def[name])) - reachable_names)
+    return reachable_names
+
+
+def _count_refs(schema: Any) -> dict[str, int]:
+    name_to_ref_count: dict[str, int] = {}
+    values: Iterable[Any]
+    if isinstance(schema, dict):
+        ref = schema.get(_REF_KEY)
+        if isinstance(ref, str):
+            name = ref.removeprefix(_REF_PREFIX)
+            name_to_ref_count[name] = name_to_ref_count.get(name, 0) + 1
+        values = schema.values()
+    elif isinstance(schema, list):
+        values = schema
+    else:
+        return name_to_ref_count
+
+    for value in values:
+        for name, ref_count in _count_refs(value).items():
+            name_to_ref_count[name] = name_to_ref_count.get(name, 0) + ref_count
+    return name_to_ref_count
+
+
+def _merge_variants(schema: Any, name_to_def: dict[str, Any]) -> Any:
+    """
+    Replace the alternatives between models by references to their merged model,
+    adding it to the definitions.
+    """
+    if isinstance(schema, list):
+        return [_merge_variants(s, name_to_def) for s in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    schema = {k: _merge_variants(v, name_to_def) for k, v in schema.items()}
+    any_of = schema.get("anyOf")
+    if any_of is None:
+        return schema
+    variant_names = [
+        s[_REF_KEY].removeprefix(_REF_PREFIX) for s in any_of if _REF_KEY in s
+    ]
+    other_schemas = [s for s in any_of if _REF_KEY not in s]
+    if len(variant_names) < 2 or any(s != {"type": "null"} for s in other_schemas):
+        return schema
+
+    variant_schemas = [name_to_def[n] for n in variant_names]
+    properties: dict[str, Any] = {}
+    for variant_schema in variant_schemas:
+        if variant_schema.get("type") != "object":
+            return schema
+        for field_name, field_schema in variant_schema.get("properties", {}).items():
+            # NOTE: conflicting fields keep the alternatives apart
+            if properties.setdefault(field_name, field_schema) != field_schema:
+                return schema
+    required = [
+        n
+        for n in properties
+        if all(n in s.get("required", ()) for s in variant_schemas)
+    ]
+
+    merged_name = "Or".join(variant_names)
+    name_to_def[merged_name] = {
+        "properties": properties,
+        "required": required,
+        "type": "object",
+    }
+    merged_ref = {_REF_KEY: f"{_REF_PREFIX}{merged_name}"}
+    if len(other_schemas) == 0:
+        return {**{k: v for k, v in schema.items() if k != "anyOf"}, **merged_ref}
+    return {**schema, "anyOf": [merged_ref, *other_schemas]}
+
+
+def _transform(
+    schema: dict[str, Any],
+    name_to_def: dict[str, Any],
+    referenced_names: set[str],
+    compact: bool,
+) -> dict[str, Any]:
+    def transform(sub_schema: dict[str, Any]) -> dict[str, Any]:
+        return _transform(sub_schema, name_to_def, referenced_names, compact)
+
+    schema = _drop_null(schema)
+
+    ref = schema.get(_REF_KEY)
+    if ref is not None:
+        name = ref.removeprefix(_REF_PREFIX)
+        if name in referenced_names:
+            return {_REF_KEY: ref}
+        # NOTE: annotations next to the reference, like titles, apply to the inlined
+        return transform(
+            {**name_to_def[name], **{k: v for k, v in schema.items() if k != _REF_KEY}}
+        )
+
+    transformed_schema: dict[str, Any] = {}
+    for key, value in schema.items():
+        if key in (_COMPACT_STRIPPED_KEYS if compact else _STRIPPED_KEYS):
+            continue
+        if key == "properties":
+            transformed_schema[key] = {n: transform(s) for n, s in value.items()}
+        elif key in ("items", "additionalProperties") and isinstance(value, dict):
+            transformed_schema[key] = transform(value)
+        elif key in ("anyOf", "allOf", "oneOf"):
+            transformed_schema[key] = [transform(s) for s in value]
+        else:
+            transformed_schema[key] = value
+    return transformed_schema
+
+
+def _drop_null(schema: dict[str, Any]) -> dict[str, Any]:
+    any_of = schema.get("anyOf")
+    if any_of is None or {"type": "null"} not in any_of:
+        return schema
+
+    non_null_schemas = [s for s in any_of if s != {"type": "null"}]
+    schema = {
+        k: v
+        for k, v in schema.items()
+        if k != "anyOf" and not (k == "default" and v is None)
+    }
+    if len(non_null_schemas) == 1:
+        return {**non_null_schemas[0], **schema}
+    return {"anyOf": non_null_schemas, **schema}
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from apply_gpt.curriculum_generator import CurriculumGenerator
+from apply_gpt.data import AboutMe, Curriculum
+from apply_gpt.metrics import Metrics
+
+
+class ServiceBusyError(Exception):
+    """
+    Raised when a job is submitted while the queue of the service is full.
+    """
+
+
+class CurriculumService:
+    """
+    Generates curriculums for jobs submitted over local HTTP, by a pool of workers.
+
+    Jobs wait in a bounded queue, and those submitted while it is full are rejected
+    with status 503, so that clients back off instead of piling up requests. The
+    service understands the following requests:
+    - `POST /curriculums` with a JSON object with a `job_description` string, replied
+      with the curriculum once generated
+    - `GET /health` replied with the numbers of queued, running, done and failed jobs
+    - `GET /metrics` replied with the metrics in Prometheus text format, if recorded
+    """
+
+    def __init__(
+        self,
+        curriculum_generator: CurriculumGenerator,
+        about_me: AboutMe,
+        worker_count: int = 4,
+        queue_size: int = 64,
+        metrics: Metrics | None = None,
+        max_body_bytes: int = 1024 * 1024,
+    ) -> None:
+        """
+        :param curriculum_generator: the generator, built once for all jobs
+        :param about_me: the information about the user the curriculums are about
+        :param worker_count: the number of curriculums generated concurrently
+        :param queue_size: the number of jobs waiting for a worker at most
+        :param metrics: the metrics to expose, recorded by the generator
+        :param max_body_bytes: the size of the largest request body accepted
+        """
+        self._curriculum_generator = curriculum_generator
+        self._about_me = about_me
+        self._worker_count = worker_count
+        self._queue_size = queue_size
+        self._metrics = metrics
+        self._max_body_bytes = max_body_bytes
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._running_count = 0
+        self._done_count = 0
+        self._failed_count = 0
+
+    async def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        unix_socket_path: Path | None = None,
+        stop: asyncio.Event | None = None,
+    ) -> None:
+        """
+        Serve on a TCP port, or on a Unix socket if given, until stopped.
+
+        :param stop: the event stopping the service, which then finishes the jobs
+            already submitted, never stopping if not given
+        """
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+        if unix_socket_path is not None:
+            server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix_socket_path
+            )
+        else:
+            server = await asyncio.start_server(
+                self._handle_connection, host=host, port=port
+            )
+
+        try:
+            async with server:
+                await (stop or asyncio.Event()).wait()
+                server.close()
+                await server.wait_closed()
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._queue = None
+
+    async def submit(self, job_description: str) -> Curriculum:
+        """
+        Generate a curriculum by a worker, raising `ServiceBusyError` if none is
+        going to be free soon.
+        """
+        if self._queue is None:
+            raise RuntimeError("Service not serving")
+        job = _Job(job_description, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise ServiceBusyError(f"More than {self._queue_size} jobs queued")
+        return await job.curriculum_future
+
+    def health(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running_count,
+            "done": self._done_count,
+            "failed": self._failed_count,
+        }
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            self._running_count += 1
+            try:
+                curriculum = await self._curriculum_generator.agenerate_curriculum(
+                    about_me=self._about_me, job_description=job.job_description
+                )
+            except Exception as e:
+                self._failed_count += 1
+                if not job.curriculum_future.done():
+                    job.curriculum_future.set_exception(e)
+            else:
+                self._done_count += 1
+                if not job.curriculum_future.done():
+                    job.curriculum_future.set_result(curriculum)
+            finally:
+                self._running_count -= 1
+                self._queue.task_done()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            # NOTE: connections are kept alive, so that clients submitting jobs
+            # continuously do not pay for a new connection each time
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                status, content_type, body = await self._respond(request)
+                keep_alive = request.keep_alive and status not in (400, 413)
+                header_lines = [
+                    f"HTTP/1.1 {status} {_STATUS_TO_REASON[status]}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    header_lines.append(f"Retry-After: {_RETRY_AFTER_SECONDS}")
+                writer.write("\r\n".join(header_lines + ["", ""]).encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> "_Request | None":
+        # NOTE: malformed requests close the connection, as nothing else can be
+        # trusted to be read from it
+        request_line = await reader.readline()
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            return None
+        method, path, version = parts
+
+        headers: dict[str, str] = {}
+        while True:
+            header_line = await reader.readline()
+            if header_line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header_line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        content_length_text = headers.get("content-length", "0")
+        if not content_length_text.isdigit():
+            return None
+        content_length = int(content_length_text)
+        if content_length > self._max_body_bytes:
+            return _Request(method, path, None, keep_alive=False)
+        body = await reader.readexactly(content_length)
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = (
+            connection != "close"
+            if version == "HTTP/1.1"
+            else connection == "keep-alive"
+        )
+        return _Request(method, path, body, keep_alive)
+
+    async def _respond(self, request: "_Request") -> tuple[int, str, bytes]:
+        if request.path == "/health" and request.method == "GET":
+            return _json_response(200, self.health())
+        if request.path == "/metrics" and request.method == "GET":
+            if self._metrics is None:
+                return _json_response(404, {"error": "Metrics not recorded"})
+            return (
+                200,
+                "text/plain; version=0.0.4",
+                self._metrics.to_prometheus().encode(),
+            )
+        if request.path != "/curriculums":
+            return _json_response(404, {"error": f"No resource at `{request.path}`"})
+        if request.method != "POST":
+            return _json_response(
+                405, {"error": f"Method {request.method} not allowed"}
+            )
+        if request.body is None:
+            return _json_response(
+                413, {"error": f"Body larger than {self._max_body_bytes} bytes"}
+            )
+
+        try:
+            job_description = json.loads(request.body)["job_description"]
+            if not isinstance(job_description, str):
+                raise TypeError("`job_description` should be a string")
+        except (ValueError, KeyError, TypeError) as e:
+            return _json_response(400, {"error": f"Invalid job: {e!r}"})
+
+        try:
+            curriculum = await self.submit(job_description)
+        except ServiceBusyError as e:
+            return _json_response(503, {"error": str(e)})
+        except Exception as e:
+            print(f"Failed to generate curriculum: {e!r}", file=sys.stderr)
+            return _json_response(500, {"error": repr(e)})
+        return _json_response(200, curriculum.model_dump(mode="json"))
+
+
+class _Job(NamedTuple):
+    job_description: str
+    curriculum_future: asyncio.Future[Curriculum]
+
+
+class _Request(NamedTuple):
+    method: str
+    path: str
+    body: bytes | None
+    keep_alive: bool
+
+
+def _json_response(status: int, json_: Any) -> tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(json_).encode()
+
+
+_RETRY_AFTER_SECONDS = 1
+
+_STATUS_TO_REASON = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Sequence
+
+
+class TaskGraph:
+    """
+    Runs asynchronous tasks concurrently, each as soon as its dependencies are done.
+
+    Tasks must be added after their dependencies, which rules out cycles. Each task
+    is called with the results of its dependencies, in the order they are listed.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, tuple[Callable[..., Awaitable[Any]], Sequence[str]]] = {}
+
+    def add(
+        self,
+        name: str,
+        function: Callable[..., Awaitable[Any]],
+        dependencies: Sequence[str] = (),
+    ) -> None:
+        if name in self._tasks:
+            raise ValueError(f"Task `{name}` already added")
+        for dependency in dependencies:
+            if dependency not in self._tasks:
+                raise ValueError(
+                    f"Dependency `{dependency}` of task `{name}` not added yet"
+                )
+        self._tasks[name] = (function, dependencies)
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Run all tasks, returning the result of each by name.
+
+        If a task fails, the tasks still running are cancelled and the error raised.
+        """
+        futures: dict[str, asyncio.Future[Any]] = {}
+        for name, (function, dependencies) in self._tasks.items():
+            futures[name] = asyncio.ensure_future(
+                TaskGraph._run_task(function, [futures[d] for d in dependencies])
+            )
+
+        try:
+            results = await asyncio.gather(*futures.values())
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+        return dict(zip(futures, results))
+
+    @staticmethod
+    async def _run_task(
+        function: Callable[..., Awaitable[Any]],
+        dependency_futures: Sequence[asyncio.Future[Any]],
+    ) -> Any:
+        dependency_results = [await f for f in dependency_futures]
+        return await function(*dependency_results)
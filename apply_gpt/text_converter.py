@@ -13,26 +13,32 @@ class TextConverter(Protocol):
 
 class SimpleTextConverter(TextConverter):
     def textify_employment(self, employment: Employment) -> str:
-        text = ""
-        text += f"Role: {employment.role}\n"
-        text += f"Company: {employment.company}\n"
-        text += f"{self._textify_period(employment.start_date, employment.end_date)}\n"
+        lines = [
+            f"Role: {employment.role}",
+            f"Company: {employment.company}",
+            self._textify_period(employment.start_date, employment.end_date),
+        ]
         if employment.achievements is not None:
-            text += "List of achievements:\n"
-            text += "\n".join(f"- {a}" for a in employment.achievements)
-        return text
+            lines.append("List of achievements:")
+            lines.append("\n".join(f"- {a}" for a in employment.achievements))
+        else:
+            lines.append("")
+        return "\n".join(lines)
 
     def textify_education(self, education: Education) -> str:
-        text = ""
-        text += f"Degree: {education.degree}\n"
-        text += f"Institution: {education.institution}\n"
+        lines = [
+            f"Degree: {education.degree}",
+            f"Institution: {education.institution}",
+        ]
         if education.grade is not None:
-            text += f"Grade: {education.grade}\n"
-        text += f"{self._textify_period(education.start_date, education.end_date)}\n"
+            lines.append(f"Grade: {education.grade}")
+        lines.append(self._textify_period(education.start_date, education.end_date))
         if education.achievements is not None:
-            text += "List of achievements:\n"
-            text += "\n".join(f"- {a}" for a in education.achievements)
-        return text
+            lines.append("List of achievements:")
+            lines.append("\n".join(f"- {a}" for a in education.achievements))
+        else:
+            lines.append("")
+        return "\n".join(lines)
 
     def _textify_period(self, start_date: Date, end_date: Date | None) -> str:
         text = f"Period: {self._textify_date(start_date)} to "
@@ -1,3 +1,26 @@
-from typing import TypeAlias
+import math
+import re
+from typing import Sequence, TypeAlias
 
 Json: TypeAlias = dict[str, "Json"] | list["Json"] | str | int | float | bool | None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text, about four characters each for English.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def extract_terms(text: str) -> Sequence[str]:
+    """
+    Extract the lowercase terms of a text, keeping terms like "c++" or "c#", and
+    dropping stop words.
+    """
+    return [t for t in _TERM_REGEX.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+_TERM_REGEX = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOP_WORDS = frozenset(
+    ("a", "an", "and", "as", "for", "in", "of", "on", "or", "the", "to", "with")
+)
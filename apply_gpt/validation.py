@@ -0,0 +1,52 @@
+from typing import Any, Iterable, Iterator, NamedTuple, Sequence, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import ErrorDetails
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+class RecordError(NamedTuple):
+    """
+    The errors of a record failing validation, e.g. of a line of a JSONL stream.
+    """
+
+    record_index: int
+    errors: Sequence[ErrorDetails]
+
+
+def validate_records(
+    model: type[Model], records: Iterable[Any]
+) -> Iterator[Model | RecordError]:
+    """
+    Validate records one by one, yielding either the model or the errors of each.
+
+    :param model: the model to validate the records as, e.g. `Experience`
+    :param records: the records, e.g. dictionaries parsed from JSON or YAML
+    """
+    for index, record in enumerate(records):
+        try:
+            yield model.model_validate(record)
+        except ValidationError as e:
+            yield RecordError(index, e.errors(include_url=False))
+
+
+def validate_jsonl(
+    model: type[Model], lines: Iterable[str | bytes]
+) -> Iterator[Model | RecordError]:
+    """
+    Validate a JSONL stream, yielding either the model or the errors of each line.
+
+    Lines are parsed and validated in one pass, and malformed JSON is reported like
+    any other error. Blank lines are skipped, but still counted in the indexes.
+
+    :param model: the model to validate the lines as, e.g. `Experience`
+    :param lines: the lines, e.g. an open file
+    """
+    for index, line in enumerate(lines):
+        if len(line.strip()) == 0:
+            continue
+        try:
+            yield model.model_validate_json(line)
+        except ValidationError as e:
+            yield RecordError(index, e.errors(include_url=False))
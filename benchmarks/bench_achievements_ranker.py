@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local achievements ranker.
+
+Times the ranking of synthetic achievements and, when a recorded tuning session is
+provided, compares the local ordering with the one produced by the model.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Sequence
+
+from apply_gpt.achievements_ranker import WeightedOverlapAchievementsRanker
+
+_SKILLS = (
+    "Python",
+    "C++",
+    "PyTorch",
+    "TensorFlow",
+    "Deep Learning",
+    "Natural Language Processing",
+    "Computer Vision",
+    "Distributed Systems",
+    "Kubernetes",
+    "Docker",
+    "Microservices",
+    "SQL",
+    "Data Engineering",
+    "Apache Spark",
+    "A/B Testing",
+    "Recommendation Systems",
+    "Reinforcement Learning",
+    "Generative Models",
+    "MLOps",
+    "Cloud Computing",
+    "AWS",
+    "Statistics",
+    "Information Retrieval",
+    "Large Language Models",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--achievements",
+        type=int,
+        default=5000,
+        help="Number of synthetic achievements to rank",
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        type=int,
+        default=20,
+        help="Number of timed rankings",
+    )
+    parser.add_argument(
+        "--session",
+        type=Path,
+        default=None,
+        help=(
+            "Path to a JSON file recorded from a tuning session, with keys "
+            "`requirements`, `id_to_skills` and `sorted_ids` (the model ordering)"
+        ),
+    )
+    args = parser.parse_args()
+    achievement_count: int = args.achievements
+    repetitions: int = args.repetitions
+    session_path: Path | None = args.session
+
+    ranker = WeightedOverlapAchievementsRanker()
+
+    rng = random.Random(0)
+    requirements = rng.sample(_SKILLS, 12)
+    id_to_skills = {
+        f"{id_}": rng.sample(_SKILLS, rng.randint(1, 4))
+        for id_ in range(1, achievement_count + 1)
+    }
+
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        ranker.rank(requirements, id_to_skills)
+        timings.append(time.perf_counter() - start)
+
+    print(
+        f"Ranked {achievement_count} achievements: "
+        f"median {statistics.median(timings) * 1000:.2f} ms, "
+        f"min {min(timings) * 1000:.2f} ms"
+    )
+
+    if session_path is not None:
+        session = json.loads(session_path.read_text())
+        model_sorted_ids: Sequence[str] = session["sorted_ids"]
+        local_sorted_ids = ranker.rank(session["requirements"], session["id_to_skills"])
+        print(
+            f"Spearman correlation with model ordering: "
+            f"{spearman_correlation(model_sorted_ids, local_sorted_ids):.3f}"
+        )
+        for k in (3, 5, 10):
+            overlap = len(set(model_sorted_ids[:k]) & set(local_sorted_ids[:k]))
+            print(f"Top-{k} overlap with model ordering: {overlap}/{k}")
+
+
+def spearman_correlation(
+    sorted_ids_a: Sequence[str], sorted_ids_b: Sequence[str]
+) -> float:
+    ids_a = set(sorted_ids_a)
+    ids_b = set(sorted_ids_b)
+    common_ids = [id_ for id_ in sorted_ids_a if id_ in ids_b]
+    n = len(common_ids)
+    if n < 2:
+        return float("nan")
+    rank_b = {
+        id_: rank
+        for rank, id_ in enumerate(id_ for id_ in sorted_ids_b if id_ in ids_a)
+    }
+    squared_differences = sum(
+        (rank_a - rank_b[id_]) ** 2 for rank_a, id_ in enumerate(common_ids)
+    )
+    return 1 - 6 * squared_differences / (n * (n**2 - 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark writing Batch API input files and ingesting their output files.
+
+Writes the requests of synthetic jobs for the profile and job descriptions in
+`tests/assets`, replies to them with a local fake of the Batch API, and ingests the
+results into JSONL shards, reporting the throughput of each step in jobs per second.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from apply_gpt.batch import BatchJob, Checkpoint, JsonlShards
+from apply_gpt.batch_api import create_batch_requests, ingest_batch_results
+from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+from apply_gpt.fake_openai import FakeOpenaiModule, create_experience_json
+from apply_gpt.loading import load_about_me
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.text_converter import SimpleTextConverter
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_OPENAI_ASSETS_PATH = _REPOSITORY_PATH / "apply_gpt" / "openai-assets"
+_TEST_ASSETS_PATH = _REPOSITORY_PATH / "tests" / "assets"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--jobs",
+        type=int,
+        default=2_000,
+        help="Number of synthetic jobs in the batch",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.01,
+        help="Probability of each request failing in the fake Batch API",
+    )
+    args = parser.parse_args()
+    job_count: int = args.jobs
+    error_rate: float = args.error_rate
+
+    about_me_path = _TEST_ASSETS_PATH / "about" / "lindsay.yaml"
+    job_description_paths = sorted((_TEST_ASSETS_PATH / "jobs").iterdir())
+    jobs = [
+        BatchJob(
+            id=f"job-{i}",
+            about_me_path=about_me_path,
+            job_description_path=job_description_paths[i % len(job_description_paths)],
+        )
+        for i in range(job_count)
+    ]
+
+    about_me = load_about_me(about_me_path)
+    openai_module = FakeOpenaiModule(
+        function_name_to_arguments={
+            "generate_curriculum": create_experience_json(about_me)
+        },
+        error_rate=error_rate,
+        seed=0,
+    )
+    curriculum_generator = OpenaiCurriculumGenerator(
+        text_converter=SimpleTextConverter(),
+        openai_json_generator=OpenaiJsonGenerator(openai_module=openai_module),
+        system_message=(_OPENAI_ASSETS_PATH / "system-message.txt").read_text(),
+        user_message_template=(
+            _OPENAI_ASSETS_PATH / "user-message-template.txt"
+        ).read_text(),
+    )
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        request_lines = list(
+            create_batch_requests(
+                curriculum_generator=curriculum_generator,
+                model=openai_module.model,
+                jobs=jobs,
+                load_about_me=load_about_me,
+            )
+        )
+        write_seconds = time.perf_counter() - start
+
+        result_lines = list(openai_module.create_batch_results(request_lines))
+
+        start = time.perf_counter()
+        batch_summary = ingest_batch_results(
+            curriculum_generator=curriculum_generator,
+            jobs=jobs,
+            load_about_me=load_about_me,
+            result_lines=result_lines,
+            shards=JsonlShards(path=Path(output_dir)),
+            checkpoint=Checkpoint(path=Path(output_dir) / "checkpoint.txt"),
+        )
+        ingest_seconds = time.perf_counter() - start
+
+    print(f"{'step':>8} {'jobs/s':>10}")
+    print(f"{'write':>8} {job_count / write_seconds:>10.0f}")
+    print(f"{'ingest':>8} {job_count / ingest_seconds:>10.0f}")
+    print(
+        f"Ingested {batch_summary.done_count} curriculums, "
+        f"{batch_summary.failed_count} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark curriculum generation end to end against a local fake of OpenAI's API.
+
+For each concurrency level, measures throughput and latency percentiles of whole
+generations, as well as the time spent in prompt rendering, JSON parsing and
+validation, using the profile and job descriptions in `tests/assets`.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import Sequence
+
+import yaml
+
+from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+from apply_gpt.data import AboutMe
+from apply_gpt.fake_openai import (
+    FakeOpenaiModule,
+    create_experience_json,
+    lognormal_latency,
+)
+from apply_gpt.metrics import Metrics
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.scheduler import RequestScheduler, ScheduledChatCompletionModule
+from apply_gpt.text_converter import SimpleTextConverter
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_OPENAI_ASSETS_PATH = _REPOSITORY_PATH / "apply_gpt" / "openai-assets"
+_TEST_ASSETS_PATH = _REPOSITORY_PATH / "tests" / "assets"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=200,
+        help="Number of curriculums to generate for each concurrency level",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16, 64],
+        help="Concurrency levels to benchmark",
+    )
+    parser.add_argument(
+        "--median-latency",
+        type=float,
+        default=0.05,
+        help="Median latency in seconds of the fake API",
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.5,
+        help="Standard deviation of the logarithm of the latency of the fake API",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.02,
+        help="Probability of the fake API replying with a (retried) server error",
+    )
+    args = parser.parse_args()
+    request_count: int = args.requests
+    concurrencies: Sequence[int] = args.concurrency
+    median_latency: float = args.median_latency
+    latency_sigma: float = args.latency_sigma
+    error_rate: float = args.error_rate
+
+    about_me = AboutMe.model_validate(
+        yaml.safe_load((_TEST_ASSETS_PATH / "about" / "lindsay.yaml").read_text())
+    )
+    job_descriptions = [
+        p.read_text() for p in sorted((_TEST_ASSETS_PATH / "jobs").iterdir())
+    ]
+
+    print(
+        f"{'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'render ms':>9} {'parse ms':>8} {'validate ms':>11}"
+    )
+    for concurrency in concurrencies:
+        metrics = Metrics()
+        openai_module = FakeOpenaiModule(
+            function_name_to_arguments={
+                "generate_curriculum": create_experience_json(about_me)
+            },
+            latency=lognormal_latency(median_latency, latency_sigma),
+            error_rate=error_rate,
+            seed=0,
+        )
+        curriculum_generator = OpenaiCurriculumGenerator(
+            text_converter=SimpleTextConverter(),
+            openai_json_generator=OpenaiJsonGenerator(
+                openai_module=ScheduledChatCompletionModule(
+                    openai_module=openai_module,
+                    request_scheduler=RequestScheduler(),
+                    initial_backoff=median_latency,
+                ),
+                metrics=metrics,
+            ),
+            system_message=(_OPENAI_ASSETS_PATH / "system-message.txt").read_text(),
+            user_message_template=(
+                _OPENAI_ASSETS_PATH / "user-message-template.txt"
+            ).read_text(),
+            metrics=metrics,
+        )
+
+        latencies, elapsed = asyncio.run(
+            run(
+                curriculum_generator,
+                about_me,
+                job_descriptions,
+                request_count,
+                concurrency,
+            )
+        )
+
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        p99_latency_ms = latencies_ms[
+            min(int(0.99 * len(latencies_ms)), len(latencies_ms) - 1)
+        ]
+        print(
+            f"{concurrency:>11} "
+            f"{request_count / elapsed:>8.1f} "
+            f"{statistics.median(latencies_ms):>8.1f} "
+            f"{p99_latency_ms:>8.1f} "
+            f"{_mean_ms(metrics, 'render_seconds'):>9.3f} "
+            f"{_mean_ms(metrics, 'parse_seconds'):>8.3f} "
+            f"{_mean_ms(metrics, 'validation_seconds'):>11.3f}"
+        )
+
+
+async def run(
+    curriculum_generator: OpenaiCurriculumGenerator,
+    about_me: AboutMe,
+    job_descriptions: Sequence[str],
+    request_count: int,
+    concurrency: int,
+) -> tuple[Sequence[float], float]:
+    """
+    Generate curriculums, returning the latency of each and the overall time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def generate(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await curriculum_generator.agenerate_curriculum(
+                about_me=about_me,
+                job_description=job_descriptions[index % len(job_descriptions)],
+            )
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(generate(i) for i in range(request_count)))
+    return latencies, time.perf_counter() - start
+
+
+def _mean_ms(metrics: Metrics, metric: str) -> float:
+    return statistics.mean(metrics.samples("generate_curriculum", metric)) * 1000
+
+
+if __name__ == "__main__":
+    main()
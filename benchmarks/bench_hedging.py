@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark hedged requests against a local fake of OpenAI's API.
+
+Generates curriculums with and without duplicating the requests slower than a
+quantile of recent latencies, the duplicates going to a fake faster model, and
+reports the latency percentiles of generations, how often requests were duplicated,
+and how often the duplicates won.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from apply_gpt.curriculum_generator import validate_generated_json
+from apply_gpt.data import Experience
+from apply_gpt.fake_openai import (
+    FakeOpenaiModule,
+    create_experience_json,
+    lognormal_latency,
+)
+from apply_gpt.loading import load_about_me
+from apply_gpt.openai_ import HedgedJsonGenerator, JsonGenerator, OpenaiJsonGenerator
+from apply_gpt.schema import model_schema
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_TEST_ASSETS_PATH = _REPOSITORY_PATH / "tests" / "assets"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=500,
+        help="Number of curriculums to generate with each policy",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Number of curriculums generated concurrently",
+    )
+    parser.add_argument(
+        "--median-latency",
+        type=float,
+        default=0.05,
+        help="Median latency in seconds of the fake API",
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.8,
+        help="Standard deviation of the logarithm of the latency of the fake API",
+    )
+    parser.add_argument(
+        "--hedge-median-latency",
+        type=float,
+        default=0.03,
+        help="Median latency in seconds of the fake model of duplicate requests",
+    )
+    parser.add_argument(
+        "-q",
+        "--hedge-quantile",
+        type=float,
+        default=0.9,
+        help="Quantile of recent latencies after which requests are duplicated",
+    )
+    args = parser.parse_args()
+    request_count: int = args.requests
+    concurrency: int = args.concurrency
+    median_latency: float = args.median_latency
+    latency_sigma: float = args.latency_sigma
+    hedge_median_latency: float = args.hedge_median_latency
+    hedge_quantile: float = args.hedge_quantile
+
+    about_me = load_about_me(_TEST_ASSETS_PATH / "about" / "lindsay.yaml")
+    function_name_to_arguments = {
+        "generate_curriculum": create_experience_json(about_me)
+    }
+
+    def create_json_generator(median_latency: float, seed: int) -> JsonGenerator:
+        return OpenaiJsonGenerator(
+            openai_module=FakeOpenaiModule(
+                function_name_to_arguments=function_name_to_arguments,
+                latency=lognormal_latency(median_latency, latency_sigma),
+                seed=seed,
+            )
+        )
+
+    hedged_json_generator = HedgedJsonGenerator(
+        json_generator=create_json_generator(median_latency, seed=0),
+        hedge_json_generator=create_json_generator(hedge_median_latency, seed=1),
+        deadline_quantile=hedge_quantile,
+        validate=validate_generated_json,
+    )
+    print(f"{'policy':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for policy, json_generator in (
+        ("single", create_json_generator(median_latency, seed=0)),
+        ("hedged", hedged_json_generator),
+    ):
+        latencies = sorted(asyncio.run(run(json_generator, request_count, concurrency)))
+        quantile_latencies = (
+            latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+            for q in (0.5, 0.9, 0.99, 1.0)
+        )
+        print(
+            f"{policy:>8} "
+            + " ".join(f"{latency * 1000:>8.1f}" for latency in quantile_latencies)
+        )
+    print(
+        f"Duplicated {hedged_json_generator.hedged_count} of "
+        f"{hedged_json_generator.generation_count} requests, "
+        f"duplicates won {hedged_json_generator.hedge_won_count} times"
+    )
+
+
+async def run(
+    json_generator: JsonGenerator, request_count: int, concurrency: int
+) -> list[float]:
+    """
+    Generate experiences, returning the latency of each.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    schema = model_schema(Experience)
+    latencies: list[float] = []
+
+    async def generate() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await json_generator.agenerate(
+                system_message="Generate a curriculum",
+                user_message="For this job",
+                name="curriculum",
+                schema=schema,
+            )
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(generate() for _ in range(request_count)))
+    return latencies
+
+
+if __name__ == "__main__":
+    main()
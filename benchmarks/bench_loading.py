@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading the information about the user.
+
+Loads a large synthetic profile with the pure-Python YAML loader, with the C
+loader, and from a validated snapshot, i.e. cold and warm loads of the scripts.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import yaml
+
+from apply_gpt.cache import DiskCache
+from apply_gpt.data import AboutMe
+from apply_gpt.loading import load_about_me
+
+_WORDS = (
+    "designed",
+    "implemented",
+    "scaled",
+    "deployed",
+    "optimized",
+    "pipeline",
+    "model",
+    "service",
+    "latency",
+    "throughput",
+    "customers",
+    "research",
+    "distributed",
+    "training",
+    "inference",
+    "dashboard",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--employments",
+        type=int,
+        default=100,
+        help="Number of employments of the synthetic profile",
+    )
+    parser.add_argument(
+        "--achievements",
+        type=int,
+        default=30,
+        help="Number of achievements of each employment and education",
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        type=int,
+        default=10,
+        help="Number of timed loads of each kind",
+    )
+    args = parser.parse_args()
+    employment_count: int = args.employments
+    achievement_count: int = args.achievements
+    repetitions: int = args.repetitions
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        about_me_path = Path(tmp_dir) / "about-me.yaml"
+        about_me_path.write_text(
+            yaml.dump(
+                create_about_me_dict(
+                    random.Random(0), employment_count, achievement_count
+                ),
+                sort_keys=False,
+            )
+        )
+        snapshot_cache = DiskCache(Path(tmp_dir) / "cache")
+
+        def load_pure_python() -> AboutMe:
+            return AboutMe.model_validate(
+                yaml.load(about_me_path.read_text(), Loader=yaml.FullLoader)
+            )
+
+        # NOTE: first load fills the snapshot cache
+        load_about_me(about_me_path, snapshot_cache=snapshot_cache)
+
+        print(f"{'load':>20} {'mean ms':>9} {'min ms':>9}")
+        for name, load in (
+            ("pure-python yaml", load_pure_python),
+            ("c yaml", lambda: load_about_me(about_me_path)),
+            ("snapshot", lambda: load_about_me(about_me_path, snapshot_cache)),
+        ):
+            durations = time_loads(load, repetitions)
+            print(
+                f"{name:>20} {statistics.mean(durations) * 1000:>9.2f} "
+                f"{min(durations) * 1000:>9.2f}"
+            )
+
+
+def time_loads(load: Callable[[], AboutMe], repetitions: int) -> list[float]:
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        load()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def create_about_me_dict(
+    rng: random.Random, employment_count: int, achievement_count: int
+) -> dict:
+    def achievements() -> list[str]:
+        return [
+            " ".join(rng.choices(_WORDS, k=rng.randint(8, 20))).capitalize()
+            for _ in range(achievement_count)
+        ]
+
+    return {
+        "private": {
+            "name": "Synthetic Profile",
+            "address": None,
+            "phone": None,
+            "mail": "synthetic@example.com",
+            "linkedin": None,
+            "github": None,
+        },
+        "employments": [
+            {
+                "role": f"Engineer {i}",
+                "company": f"Company {i}",
+                "start_date": f"march {2000 + i % 20}",
+                "end_date": f"{2001 + i % 20}",
+                "achievements": achievements(),
+            }
+            for i in range(employment_count)
+        ],
+        "educations": [
+            {
+                "degree": f"Degree {i}",
+                "institution": f"University {i}",
+                "grade": "110/110",
+                "start_date": f"{1990 + i}",
+                "end_date": f"{1991 + i}",
+                "achievements": achievements(),
+            }
+            for i in range(3)
+        ],
+    }
+
+
+if __name__ == "__main__":
+    main()
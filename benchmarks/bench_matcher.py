@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local matcher of profiles with job descriptions.
+
+Scores synthetic profiles, made of the achievements of the profile in `tests/assets`
+with skills added, against synthetic job descriptions asking for skills, and reports
+the time taken by the whole matrix and by the selection of the best pairs.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+from apply_gpt.loading import load_about_me
+from apply_gpt.matcher import TfidfProfileJobMatcher, select_matches
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_TEST_ASSETS_PATH = _REPOSITORY_PATH / "tests" / "assets"
+
+_SKILLS = (
+    "Python",
+    "C++",
+    "PyTorch",
+    "TensorFlow",
+    "Deep Learning",
+    "Natural Language Processing",
+    "Computer Vision",
+    "Distributed Systems",
+    "Kubernetes",
+    "Docker",
+    "Microservices",
+    "SQL",
+    "Data Engineering",
+    "Apache Spark",
+    "A/B Testing",
+    "Recommendation Systems",
+    "Reinforcement Learning",
+    "Generative Models",
+    "MLOps",
+    "Cloud Computing",
+    "AWS",
+    "Statistics",
+    "Information Retrieval",
+    "Large Language Models",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-p",
+        "--profiles",
+        type=int,
+        default=100,
+        help="Number of synthetic profiles",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=10_000,
+        help="Number of synthetic job descriptions",
+    )
+    parser.add_argument(
+        "-k",
+        "--top-k-per-job",
+        type=int,
+        default=3,
+        help="Number of best matching profiles kept for each job",
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        type=int,
+        default=3,
+        help="Number of timed matrices",
+    )
+    args = parser.parse_args()
+    profile_count: int = args.profiles
+    job_count: int = args.jobs
+    top_k_per_job: int = args.top_k_per_job
+    repetitions: int = args.repetitions
+
+    rng = random.Random(0)
+    about_me = load_about_me(_TEST_ASSETS_PATH / "about" / "lindsay.yaml")
+    about_mes = [
+        about_me.model_copy(
+            update={
+                "employments": [
+                    employment.model_copy(
+                        update={
+                            "achievements": [
+                                f"{a} using {', '.join(rng.sample(_SKILLS, 2))}"
+                                for a in employment.achievements or ()
+                            ]
+                        }
+                    )
+                    for employment in about_me.employments
+                ]
+            }
+        )
+        for _ in range(profile_count)
+    ]
+    job_description = (_TEST_ASSETS_PATH / "jobs" / "adobe.txt").read_text()
+    job_descriptions = [
+        f"{job_description}\n\nRequirements: {', '.join(rng.sample(_SKILLS, 6))}."
+        for _ in range(job_count)
+    ]
+
+    matcher = TfidfProfileJobMatcher()
+    score_timings = []
+    select_timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        scores = matcher.score(about_mes, job_descriptions)
+        score_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        matches = select_matches(scores, top_k_per_job=top_k_per_job)
+        select_timings.append(time.perf_counter() - start)
+
+    print(
+        f"Scored {profile_count} profiles x {job_count} jobs: "
+        f"median {statistics.median(score_timings) * 1000:.0f} ms, "
+        f"min {min(score_timings) * 1000:.0f} ms"
+    )
+    print(
+        f"Selected {len(matches)} of {scores.size} pairs: "
+        f"median {statistics.median(select_timings) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark the rendering of curriculum generation prompts.
+
+Renders the prompts of a large synthetic profile against many job descriptions,
+comparing the curriculum generator with a naive rendering that textifies the
+profile and replaces the template tokens again for every job description.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+from apply_gpt.data import AboutMe, Date, DetailedDate, Education, Employment, Month
+from apply_gpt.fake_openai import FakeOpenaiModule, create_experience_json
+from apply_gpt.metrics import Metrics
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.text_converter import SimpleTextConverter, TextConverter
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_OPENAI_ASSETS_PATH = _REPOSITORY_PATH / "apply_gpt" / "openai-assets"
+
+_WORDS = (
+    "designed",
+    "implemented",
+    "scaled",
+    "deployed",
+    "optimized",
+    "pipeline",
+    "model",
+    "service",
+    "latency",
+    "throughput",
+    "customers",
+    "research",
+    "distributed",
+    "training",
+    "inference",
+    "dashboard",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--jobs",
+        type=int,
+        default=2000,
+        help="Number of job descriptions to render prompts for",
+    )
+    parser.add_argument(
+        "--employments",
+        type=int,
+        default=40,
+        help="Number of employments of the synthetic profile",
+    )
+    parser.add_argument(
+        "--achievements",
+        type=int,
+        default=25,
+        help="Number of achievements of each employment and education",
+    )
+    args = parser.parse_args()
+    job_count: int = args.jobs
+    employment_count: int = args.employments
+    achievement_count: int = args.achievements
+
+    rng = random.Random(0)
+    about_me = create_about_me(rng, employment_count, achievement_count)
+    job_descriptions = [
+        " ".join(rng.choices(_WORDS, k=400)) for _ in range(min(job_count, 100))
+    ]
+    system_message = (_OPENAI_ASSETS_PATH / "system-message.txt").read_text()
+    user_message_template = (
+        _OPENAI_ASSETS_PATH / "user-message-template.txt"
+    ).read_text()
+    text_converter = SimpleTextConverter()
+
+    start = time.perf_counter()
+    for i in range(job_count):
+        render_naively(
+            text_converter,
+            user_message_template,
+            about_me,
+            job_descriptions[i % len(job_descriptions)],
+        )
+    naive_elapsed = time.perf_counter() - start
+
+    metrics = Metrics()
+    curriculum_generator = OpenaiCurriculumGenerator(
+        text_converter=text_converter,
+        openai_json_generator=OpenaiJsonGenerator(
+            openai_module=FakeOpenaiModule(
+                function_name_to_arguments={
+                    "generate_curriculum": create_experience_json(about_me)
+                }
+            ),
+            metrics=metrics,
+        ),
+        system_message=system_message,
+        user_message_template=user_message_template,
+        metrics=metrics,
+    )
+    for i in range(job_count):
+        curriculum_generator.generate_curriculum(
+            about_me=about_me,
+            job_description=job_descriptions[i % len(job_descriptions)],
+        )
+    render_seconds = metrics.samples("generate_curriculum", "render_seconds")
+
+    print(f"{'rendering':>20} {'first ms':>9} {'mean ms':>9} {'total s':>8}")
+    print(
+        f"{'naive':>20} {'':>9} "
+        f"{naive_elapsed / job_count * 1000:>9.3f} {naive_elapsed:>8.3f}"
+    )
+    print(
+        f"{'curriculum generator':>20} {render_seconds[0] * 1000:>9.3f} "
+        f"{statistics.mean(render_seconds[1:] or render_seconds) * 1000:>9.3f} "
+        f"{sum(render_seconds):>8.3f}"
+    )
+
+
+def render_naively(
+    text_converter: TextConverter,
+    user_message_template: str,
+    about_me: AboutMe,
+    job_description: str,
+) -> str:
+    employments = "\n".join(
+        text_converter.textify_employment(e) for e in about_me.employments
+    )
+    educations = "\n".join(
+        text_converter.textify_education(e) for e in about_me.educations
+    )
+    return (
+        user_message_template.replace(
+            OpenaiCurriculumGenerator.EMPLOYMENTS_TOKEN, employments
+        )
+        .replace(OpenaiCurriculumGenerator.EDUCATIONS_TOKEN, educations)
+        .replace(OpenaiCurriculumGenerator.JOB_DESCRIPTION_TOKEN, job_description)
+    )
+
+
+def create_about_me(
+    rng: random.Random, employment_count: int, achievement_count: int
+) -> AboutMe:
+    def achievements() -> list[str]:
+        return [
+            " ".join(rng.choices(_WORDS, k=rng.randint(8, 20))).capitalize()
+            for _ in range(achievement_count)
+        ]
+
+    return AboutMe.model_validate(
+        {
+            "private": {
+                "name": "Synthetic Profile",
+                "address": None,
+                "phone": None,
+                "mail": "synthetic@example.com",
+                "linkedin": None,
+                "github": None,
+            },
+            "employments": [
+                Employment(
+                    role=f"Engineer {i}",
+                    company=f"Company {i}",
+                    start_date=DetailedDate(year=2000 + i % 20, month=Month.MARCH),
+                    end_date=Date(year=2001 + i % 20),
+                    achievements=achievements(),
+                )
+                for i in range(employment_count)
+            ],
+            "educations": [
+                Education(
+                    degree=f"Degree {i}",
+                    institution=f"University {i}",
+                    grade="110/110",
+                    start_date=Date(year=1990 + i),
+                    end_date=Date(year=1991 + i),
+                    achievements=achievements(),
+                )
+                for i in range(3)
+            ],
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
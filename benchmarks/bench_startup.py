@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup of the scripts, failing when over budget.
+
+Runs each script with `--help` under `-X importtime`, and reports the time spent
+importing modules beyond those imported by the bare interpreter, as well as the
+heaviest of them. Exits with a non-zero status when the median import time of a
+script exceeds the budget, or when a script imports a module that should only be
+imported when actually needed, so that it can be run as a check.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Sequence
+
+_REPOSITORY_PATH = Path(__file__).parent.parent
+_SCRIPTS_PATH = _REPOSITORY_PATH / "scripts"
+
+_SCRIPT_NAMES = (
+    "generate-curriculum",
+    "match-jobs",
+    "serve-curriculums",
+    "tune-achievements",
+)
+_DEFERRED_MODULES = ("openai", "numpy", "pydantic", "yaml")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        type=int,
+        default=5,
+        help="Number of timed runs of each script",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100.0,
+        help="Maximum median import time in milliseconds of each script",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of heaviest imports to report for each script",
+    )
+    args = parser.parse_args()
+    repetitions: int = args.repetitions
+    budget_ms: float = args.budget_ms
+    top: int = args.top
+
+    baseline_modules, _ = import_times(["-c", "pass"])
+
+    failures: list[str] = []
+    for script_name in _SCRIPT_NAMES:
+        runs, imported_modules = zip(
+            *(
+                import_times([str(_SCRIPTS_PATH / script_name), "--help"])
+                for _ in range(repetitions)
+            )
+        )
+        import_ms = statistics.median(
+            sum(ms for module, ms in run.items() if module not in baseline_modules)
+            for run in runs
+        )
+        print(f"{script_name}: {import_ms:.1f} ms of imports (budget {budget_ms} ms)")
+        heaviest_modules = sorted(
+            ((m, ms) for m, ms in runs[-1].items() if m not in baseline_modules),
+            key=lambda module_ms: module_ms[1],
+            reverse=True,
+        )[:top]
+        for module, ms in heaviest_modules:
+            print(f"  {ms:>8.1f} ms {module}")
+
+        if import_ms > budget_ms:
+            failures.append(f"{script_name} is over budget")
+        for module in _DEFERRED_MODULES:
+            if module in imported_modules[-1]:
+                failures.append(f"{script_name} imports {module} on startup")
+
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    if len(failures) > 0:
+        sys.exit(1)
+
+
+def import_times(arguments: Sequence[str]) -> tuple[dict[str, float], set[str]]:
+    """
+    Run the interpreter with the given arguments, returning the cumulative import
+    time in milliseconds of each top-level import, and all the imported modules.
+    """
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    module_to_ms: dict[str, float] = {}
+    modules: set[str] = set()
+    for line in completed_process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line.removeprefix("import time:").split("|")
+        modules.add(module.strip())
+        # NOTE: nested imports are indented, and included in their parent's time
+        if module.startswith("  "):
+            continue
+        module_to_ms[module.strip()] = int(cumulative_us) / 1000
+    return module_to_ms, modules
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk validation of generated experiences.
+
+Validates synthetic experiences, some of which are invalid, both as parsed
+records and as a JSONL stream, reporting the throughput in records per second.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from apply_gpt.data import Experience, Month
+from apply_gpt.validation import RecordError, validate_jsonl, validate_records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--records",
+        type=int,
+        default=100_000,
+        help="Number of synthetic experiences to validate",
+    )
+    parser.add_argument(
+        "--invalid-rate",
+        type=float,
+        default=0.05,
+        help="Probability of each period ending before it starts, making it invalid",
+    )
+    args = parser.parse_args()
+    record_count: int = args.records
+    invalid_rate: float = args.invalid_rate
+
+    rng = random.Random(0)
+    records = [create_experience_dict(rng, invalid_rate) for _ in range(record_count)]
+    lines = [json.dumps(r) for r in records]
+
+    print(f"{'input':>8} {'records/s':>10} {'errors':>7}")
+    for name, validate in (
+        ("records", lambda: validate_records(Experience, records)),
+        ("jsonl", lambda: validate_jsonl(Experience, lines)),
+    ):
+        start = time.perf_counter()
+        error_count = sum(isinstance(r, RecordError) for r in validate())
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8} {record_count / elapsed:>10.0f} {error_count:>7}")
+
+
+def create_experience_dict(rng: random.Random, invalid_rate: float) -> dict:
+    def date(year: int) -> dict | str:
+        if rng.random() < 0.5:
+            return str(year)
+        return f"{rng.choice(list(Month)).value} {year}"
+
+    def period() -> dict:
+        start_year = rng.randint(1990, 2020)
+        end_year = start_year + rng.randint(0, 5)
+        if rng.random() < invalid_rate:
+            start_year, end_year = end_year + 1, start_year
+        return {"start_date": date(start_year), "end_date": date(end_year)}
+
+    return {
+        "employments": [
+            {
+                "role": "Engineer",
+                "company": f"Company {i}",
+                **period(),
+                "achievements": ["Shipped things", "Scaled other things"],
+            }
+            for i in range(3)
+        ],
+        "educations": [
+            {
+                "degree": "Master's degree",
+                "institution": "University",
+                **period(),
+                "achievements": ["Graduated"],
+            }
+        ],
+        "skillsets": [{"name": "Languages", "skills": ["Python", "C++"]}],
+    }
+
+
+if __name__ == "__main__":
+    main()
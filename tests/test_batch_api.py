@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from apply_gpt.batch import BatchJob, Checkpoint, JsonlShards
+from apply_gpt.batch_api import create_batch_requests, ingest_batch_results
+from apply_gpt.curriculum_generator import OpenaiCurriculumGenerator
+from apply_gpt.fake_openai import FakeOpenaiModule, create_experience_json
+from apply_gpt.loading import load_about_me
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.text_converter import SimpleTextConverter
+
+_OPENAI_ASSETS_PATH = Path(__file__).parent.parent / "apply_gpt" / "openai-assets"
+_TEST_ASSETS_PATH = Path(__file__).parent / "assets"
+_ABOUT_ME_PATH = _TEST_ASSETS_PATH / "about" / "lindsay.yaml"
+_JOB_DESCRIPTION_PATH = _TEST_ASSETS_PATH / "jobs" / "adobe.txt"
+
+
+def _create_fake_openai_module(error_rate: float = 0.0) -> FakeOpenaiModule:
+    return FakeOpenaiModule(
+        function_name_to_arguments={
+            "generate_curriculum": create_experience_json(load_about_me(_ABOUT_ME_PATH))
+        },
+        error_rate=error_rate,
+    )
+
+
+def _create_curriculum_generator() -> OpenaiCurriculumGenerator:
+    return OpenaiCurriculumGenerator(
+        text_converter=SimpleTextConverter(),
+        openai_json_generator=OpenaiJsonGenerator(
+            openai_module=_create_fake_openai_module()
+        ),
+        system_message=(_OPENAI_ASSETS_PATH / "system-message.txt").read_text(),
+        user_message_template=(
+            _OPENAI_ASSETS_PATH / "user-message-template.txt"
+        ).read_text(),
+    )
+
+
+def test_failed_results_are_reported_and_successful_ones_ingested(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    jobs = [
+        BatchJob(
+            id=f"job-{i}",
+            about_me_path=_ABOUT_ME_PATH,
+            job_description_path=_JOB_DESCRIPTION_PATH,
+        )
+        for i in range(3)
+    ]
+    curriculum_generator = _create_curriculum_generator()
+    request_lines = list(
+        create_batch_requests(
+            curriculum_generator=curriculum_generator,
+            model="fake",
+            jobs=jobs,
+            load_about_me=load_about_me,
+        )
+    )
+    # NOTE: the second request fails, like a server error in the Batch API
+    result_lines = [
+        *_create_fake_openai_module().create_batch_results(request_lines[:1]),
+        *_create_fake_openai_module(error_rate=1.0).create_batch_results(
+            request_lines[1:2]
+        ),
+        *_create_fake_openai_module().create_batch_results(request_lines[2:]),
+    ]
+    checkpoint = Checkpoint(path=tmp_path / "checkpoint.txt")
+
+    batch_summary = ingest_batch_results(
+        curriculum_generator=curriculum_generator,
+        jobs=jobs,
+        load_about_me=load_about_me,
+        result_lines=result_lines,
+        shards=JsonlShards(path=tmp_path / "shards"),
+        checkpoint=checkpoint,
+    )
+
+    assert batch_summary.done_count == 2
+    assert batch_summary.failed_count == 1
+    assert "Failed on result at line 2" in capsys.readouterr().err
+    assert [checkpoint.is_done(job.id) for job in jobs] == [True, False, True]
+    records = [
+        json.loads(line)
+        for shard_path in (tmp_path / "shards").glob("shard-*.jsonl")
+        for line in shard_path.read_text().splitlines()
+    ]
+    assert sorted(r["id"] for r in records) == ["job-0", "job-2"]
+
+
+def test_results_of_jobs_done_are_skipped(tmp_path: Path) -> None:
+    jobs = [
+        BatchJob(
+            id="job-0",
+            about_me_path=_ABOUT_ME_PATH,
+            job_description_path=_JOB_DESCRIPTION_PATH,
+        )
+    ]
+    curriculum_generator = _create_curriculum_generator()
+    request_lines = list(
+        create_batch_requests(
+            curriculum_generator=curriculum_generator,
+            model="fake",
+            jobs=jobs,
+            load_about_me=load_about_me,
+        )
+    )
+    result_lines = list(
+        _create_fake_openai_module().create_batch_results(request_lines)
+    )
+    checkpoint = Checkpoint(path=tmp_path / "checkpoint.txt")
+    checkpoint.mark_done("job-0")
+
+    batch_summary = ingest_batch_results(
+        curriculum_generator=curriculum_generator,
+        jobs=jobs,
+        load_about_me=load_about_me,
+        result_lines=result_lines,
+        shards=JsonlShards(path=tmp_path / "shards"),
+        checkpoint=checkpoint,
+    )
+
+    assert batch_summary.skipped_count == 1
+    assert batch_summary.done_count == 0
+    assert list((tmp_path / "shards").glob("shard-*.jsonl")) == []
@@ -0,0 +1,86 @@
+import asyncio
+import random
+import time
+
+from apply_gpt.fake_openai import FakeOpenaiModule
+from apply_gpt.openai_ import HedgedJsonGenerator, OpenaiJsonGenerator
+from apply_gpt.utils import Json
+
+_GREETING_JSON_SCHEMA: OpenaiJsonGenerator.Schema = {
+    "type": "object",
+    "required": ("text",),
+    "properties": {"text": {"type": "string"}},
+}
+
+
+def _create_json_generator(model: str, latency: float) -> OpenaiJsonGenerator:
+    def sample_latency(random_: random.Random) -> float:
+        return latency
+
+    return OpenaiJsonGenerator(
+        openai_module=FakeOpenaiModule(
+            function_name_to_arguments={"generate_greeting": {"text": model}},
+            latency=sample_latency,
+            model=model,
+        )
+    )
+
+
+def _generate(hedged_json_generator: HedgedJsonGenerator) -> Json:
+    return asyncio.run(
+        hedged_json_generator.agenerate(
+            system_message="You generate greetings.",
+            user_message="Greet the user.",
+            name="greeting",
+            schema=_GREETING_JSON_SCHEMA,
+        )
+    )
+
+
+def test_slow_generation_is_hedged_and_first_result_wins() -> None:
+    hedged_json_generator = HedgedJsonGenerator(
+        json_generator=_create_json_generator("slow", latency=5.0),
+        hedge_json_generator=_create_json_generator("fast", latency=0.0),
+        initial_deadline=0.05,
+    )
+
+    start = time.perf_counter()
+    generated_json = _generate(hedged_json_generator)
+
+    assert generated_json == {"text": "fast"}
+    assert time.perf_counter() - start < 1.0
+    assert hedged_json_generator.hedged_count == 1
+    assert hedged_json_generator.hedge_won_count == 1
+
+
+def test_generation_before_deadline_is_not_hedged() -> None:
+    hedged_json_generator = HedgedJsonGenerator(
+        json_generator=_create_json_generator("main", latency=0.01),
+        hedge_json_generator=_create_json_generator("hedge", latency=0.0),
+        initial_deadline=1.0,
+    )
+
+    generated_json = _generate(hedged_json_generator)
+
+    assert generated_json == {"text": "main"}
+    assert hedged_json_generator.generation_count == 1
+    assert hedged_json_generator.hedged_count == 0
+
+
+def test_invalid_hedge_loses_to_valid_first_generation() -> None:
+    def validate(name: str, generated_json: Json) -> None:
+        if generated_json != {"text": "slow"}:
+            raise ValueError(f"Invalid {name}")
+
+    hedged_json_generator = HedgedJsonGenerator(
+        json_generator=_create_json_generator("slow", latency=0.2),
+        hedge_json_generator=_create_json_generator("fast", latency=0.0),
+        initial_deadline=0.05,
+        validate=validate,
+    )
+
+    generated_json = _generate(hedged_json_generator)
+
+    assert generated_json == {"text": "slow"}
+    assert hedged_json_generator.hedged_count == 1
+    assert hedged_json_generator.hedge_won_count == 0
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any
+
+import openai
+import pytest
+
+from apply_gpt.fake_openai import FakeOpenaiModule
+from apply_gpt.openai_ import OpenaiJsonGenerator
+from apply_gpt.scheduler import (
+    Priority,
+    RequestScheduler,
+    ScheduledChatCompletionModule,
+)
+
+_GREETING_JSON_SCHEMA: OpenaiJsonGenerator.Schema = {
+    "type": "object",
+    "required": ("text",),
+    "properties": {"text": {"type": "string"}},
+}
+_REQUEST = OpenaiJsonGenerator.create_request(
+    system_message="You generate greetings.",
+    user_message="Greet the user.",
+    name="greeting",
+    schema=_GREETING_JSON_SCHEMA,
+)
+
+
+def _create_fake_openai_module(**kwargs: Any) -> FakeOpenaiModule:
+    return FakeOpenaiModule(
+        function_name_to_arguments={"generate_greeting": {"text": "Hello"}},
+        **kwargs,
+    )
+
+
+def test_interactive_requests_are_admitted_before_batch_ones() -> None:
+    async def run() -> list[str]:
+        # NOTE: 1000 tokens per second, so that each request waits for a few
+        # milliseconds once the budget is spent
+        request_scheduler = RequestScheduler(tokens_per_minute=60_000)
+        await request_scheduler.aacquire(60_000, Priority.BATCH)
+
+        openai_module = _create_fake_openai_module()
+        admitted_names: list[str] = []
+
+        async def send(name: str, priority: Priority) -> None:
+            scheduled_openai_module = ScheduledChatCompletionModule(
+                openai_module=openai_module,
+                request_scheduler=request_scheduler,
+                priority=priority,
+            )
+            await scheduled_openai_module.chat_completion_acreate(**_REQUEST)
+            admitted_names.append(name)
+
+        tasks = [
+            asyncio.create_task(send(f"batch-{i}", Priority.BATCH)) for i in range(3)
+        ]
+        # NOTE: batch requests are waiting before interactive ones arrive
+        await asyncio.sleep(0)
+        tasks += [
+            asyncio.create_task(send(f"interactive-{i}", Priority.INTERACTIVE))
+            for i in range(3)
+        ]
+        await asyncio.gather(*tasks)
+        return admitted_names
+
+    admitted_names = asyncio.run(run())
+
+    assert admitted_names == [
+        "interactive-0",
+        "interactive-1",
+        "interactive-2",
+        "batch-0",
+        "batch-1",
+        "batch-2",
+    ]
+
+
+def test_retries_wait_for_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    scheduled_openai_module = ScheduledChatCompletionModule(
+        openai_module=_create_fake_openai_module(rate_limit_rate=1.0, retry_after=30.0),
+        request_scheduler=RequestScheduler(),
+        max_retries=2,
+        initial_backoff=0.001,
+    )
+
+    with pytest.raises(openai.error.RateLimitError):
+        asyncio.run(scheduled_openai_module.chat_completion_acreate(**_REQUEST))
+
+    # NOTE: the fake sleeps for its latency, zero, before each reply
+    assert [d for d in delays if d > 0.0] == [30.0, 30.0]
+
+
+def test_retries_succeed_after_transient_errors() -> None:
+    openai_module = _create_fake_openai_module(error_rate=0.5, seed=0)
+    scheduled_openai_module = ScheduledChatCompletionModule(
+        openai_module=openai_module,
+        request_scheduler=RequestScheduler(),
+        max_retries=20,
+        initial_backoff=0.0,
+    )
+
+    completion = scheduled_openai_module.chat_completion_create(**_REQUEST)
+
+    assert completion.choices[0].message.function_call.arguments == '{"text": "Hello"}'
+
+
+def test_synchronous_and_asynchronous_requests_are_not_mixed() -> None:
+    request_scheduler = RequestScheduler()
+    request_scheduler.acquire(1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(request_scheduler.aacquire(1, Priority.INTERACTIVE))